@@ -0,0 +1,166 @@
+"""Check the NumPy breakdown splitting against the per-pixel original.
+
+Misc.__split_breakdown() and Misc.__cutoff_right() used to walk the stat
+breakdown a pixel at a time with getpixel(). The original code is kept
+here and both are run on synthetic breakdowns, three groups of lines like
+power, bars and cap, and on the breakdown area of every recording. Every
+slice has to be the same image, or both versions have to raise the same
+error. On a frame without any text next to the colons, the breakdown page
+wasn't shown, the original failed with an UnboundLocalError while the
+NumPy version returns three empty slices. Those are counted as blank.
+Prints how many frames matched and the latency of both, and exits with
+status 1 if any other frame didn't match.
+
+Usage: python -m benchmarks.breakdown [recording path] [synthetic frames]
+
+The recording path defaults to REPLAY_PATH, see "Replaying recorded
+frames" in the README. Recordings are skipped if there are none.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, List, Tuple
+
+from PIL import Image
+from PIL.Image import Image as PILImage
+
+import coordinates as coords
+import usersettings as userset
+from classes.features import Misc
+from classes.frame import Frame
+from classes.framesource import ReplayFrameSource
+from classes.inputs import Inputs
+from classes.window import Window
+
+
+def cutoff_right(bmp: PILImage) -> PILImage:
+    """The per-pixel Misc.__cutoff_right()."""
+    first_pix = bmp.getpixel((0, 0))
+    width, height = bmp.size
+    count = 0
+    for x in range(8, width):
+        dif = False
+        for y in range(0, height):
+            if not Inputs.rgb_equal(first_pix, bmp.getpixel((x, y))):
+                dif = True
+                break
+        if dif:
+            count = 0
+        else:
+            count += 1
+            if count > 8:
+                return bmp.crop((0, 0, x, height))
+    return bmp
+
+
+def split_breakdown(bmp: PILImage) -> List[PILImage]:
+    """The per-pixel Misc.__split_breakdown()."""
+    first_pix = bmp.getpixel((0, 0))
+    width, height = bmp.size
+    y1 = 1
+    offset_x = coords.OCR_BREAKDOWN_NUM[0] - coords.OCR_BREAKDOWN_COLONS[0]
+    slices = []
+    for _ in range(0, 3):
+        for y in range(y1, height):
+            if not Inputs.rgb_equal(first_pix, bmp.getpixel((0, y))):
+                y0 = y
+                break
+        for y in range(y0, height, coords.BREAKDOWN_OFFSET_Y):
+            if Inputs.rgb_equal(first_pix, bmp.getpixel((0, y))):
+                y1 = y
+                break
+        slice = bmp.crop((offset_x, y0 - 8, width, y1))
+        slices.append(cutoff_right(slice))
+    return slices
+
+
+def synthetic_breakdown(rng: random.Random) -> PILImage:
+    """Return a breakdown-like image with three groups of lines.
+
+    Every line has a mark in the first columns, where the colons are, and
+    a number of random width where the numbers are, glyphs a few pixels
+    apart with now and then a space wide enough to cut off the rest.
+    """
+    x1, y1, x2, y2 = coords.OCR_BREAKDOWN_COLONS
+    width, height = x2 - x1, y2 - y1
+    background = tuple(rng.randrange(256) for _ in range(3))
+    bmp = Image.new("RGB", (width, height), background)
+    offset_x = coords.OCR_BREAKDOWN_NUM[0] - coords.OCR_BREAKDOWN_COLONS[0]
+
+    y = rng.randrange(2, 40)
+    for _ in range(3):
+        for _ in range(rng.randrange(1, 7)):
+            if y + 12 > height:
+                break
+            ink = tuple(rng.randrange(256) for _ in range(3))
+            bmp.paste(ink, (0, y, 3, y + 12))
+            x = offset_x + rng.randrange(0, 4)
+            end = x + rng.randrange(0, width - x)
+            while x < end:
+                glyph = rng.randrange(1, 7)
+                bmp.paste(ink, (x, y + rng.randrange(0, 8), min(x + glyph, width), y + 12))
+                x += glyph + (rng.randrange(9, 30) if rng.random() < 0.05 else rng.randrange(1, 4))
+            y += coords.BREAKDOWN_OFFSET_Y
+        y += rng.randrange(coords.BREAKDOWN_OFFSET_Y, 3 * coords.BREAKDOWN_OFFSET_Y)
+    return bmp
+
+
+def run(split: Callable[[PILImage], List[PILImage]], bmp: PILImage) -> Tuple[float, object]:
+    """Return the latency in milliseconds and the slices, or the error raised."""
+    start = time.perf_counter()
+    try:
+        result = [(img.size, img.tobytes()) for img in split(bmp)]
+    except Exception as err:
+        result = type(err).__name__
+    return (time.perf_counter() - start) * 1000, result
+
+
+def recorded_breakdowns(recordings: str) -> List[PILImage]:
+    """Return the breakdown area of every recording, like Misc crops it."""
+    if not recordings or not os.path.exists(recordings):
+        return []
+    Window.source = ReplayFrameSource(recordings)
+    Window.refresh_geometry()
+    bmps = []
+    for index in range(len(Window.source.files)):
+        Window.source.seek(index)
+        Frame.invalidate()
+        bmps.append(Inputs.get_cropped_bitmap(*Window.coord_manager_area(*coords.OCR_BREAKDOWN_COLONS)))
+    return bmps
+
+
+def main(recordings: str = None, synthetic: int = 300) -> int:
+    rng = random.Random(0)
+    frames = {"synthetic": [synthetic_breakdown(rng) for _ in range(synthetic)],
+              "recorded": recorded_breakdowns(recordings or userset.REPLAY_PATH)}
+
+    failed = False
+    print(f"{'frames':<12}{'count':>7}{'same':>7}{'raised':>8}{'blank':>7}{'differ':>8}{'per-pixel':>12}{'numpy':>10}")
+    for name, bmps in frames.items():
+        if not bmps:
+            continue
+        same = raised = blank = differ = 0
+        old_times, new_times = [], []
+        for bmp in bmps:
+            old_ms, old = run(split_breakdown, bmp)
+            new_ms, new = run(Misc._Misc__split_breakdown, bmp)
+            old_times.append(old_ms)
+            new_times.append(new_ms)
+            if old == "UnboundLocalError" and not isinstance(new, str):
+                blank += 1
+            elif old != new:
+                differ += 1
+            elif isinstance(old, str):
+                raised += 1
+            else:
+                same += 1
+        failed |= differ > 0
+        print(f"{name:<12}{len(bmps):>7}{same:>7}{raised:>8}{blank:>7}{differ:>8}"
+              f"{statistics.median(old_times):>10.2f}ms{statistics.median(new_times):>8.2f}ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else None, int(sys.argv[2]) if len(sys.argv) > 2 else 300))
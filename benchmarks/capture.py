@@ -0,0 +1,55 @@
+"""Compare full-frame and region capture latency for every OCR box.
+
+The full-frame column converts the whole capture to a bitmap and crops it,
+like get_bitmap().crop() does. The region column only converts the box,
+like get_cropped_bitmap() does.
+
+With FRAME_SOURCE = "replay" in usersettings.py this runs on recorded
+frames, which measures conversion and cropping without the game.
+
+Usage: python -m benchmarks.capture [iterations]
+"""
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+from PIL import Image
+
+import coordinates as coords
+from classes.frame import Frame
+from classes.inputs import Inputs
+from classes.window import Window
+
+
+def measure(fn: Callable[[], object], iterations: int) -> List[float]:
+    """Return the latency of each call to fn in milliseconds."""
+    times = []
+    for _ in range(iterations):
+        Frame.invalidate()  # always measure a real capture
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main(iterations: int = 50) -> None:
+    Window.init()
+    boxes = {name: box for name, box in vars(coords).items()
+             if name.startswith("OCR_") and isinstance(box, coords.OCRBox)}
+    frame_h, frame_w, _ = Frame.capture().shape
+
+    full = statistics.median(measure(Frame.capture, iterations))
+    print(f"full frame {frame_w}x{frame_h}: {full:.2f} ms (median of {iterations})\n")
+    print(f"{'box':<28}{'area':>8}{'full+crop':>12}{'region':>10}{'speedup':>10}")
+    for name, box in sorted(boxes.items()):
+        # Bitmaps are created with a 8px border
+        area = (box.x1 + Window.x + 8, box.y1 + Window.y + 8, box.x2 + Window.x + 8, box.y2 + Window.y + 8)
+        cropped = statistics.median(measure(lambda: Inputs.get_bitmap().crop(area), iterations))
+        region = statistics.median(measure(lambda: Image.fromarray(Frame.capture_region(*area)), iterations))
+        share = (area[2] - area[0]) * (area[3] - area[1]) / (frame_w * frame_h)
+        print(f"{name:<28}{share:>8.1%}{cropped:>10.2f}ms{region:>8.2f}ms{cropped / region:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,60 @@
+"""Measure coordinate translations per second with and without cached geometry.
+
+Every click, cursor move and pixel read translates its coordinates with
+Window.coord_manager(). "uncached" refreshes the geometry before every
+translation, which is what each call used to cost.
+
+Usage: python -m benchmarks.geometry [seconds]
+"""
+import sys
+import time
+from typing import Callable
+
+import numpy
+
+import coordinates as coords
+from classes.window import Window
+
+
+def rate(fn: Callable[[], object], seconds: float) -> float:
+    """Return how many times per second fn can be called."""
+    calls = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        fn()
+        calls += 1
+    return calls / seconds
+
+
+def uncached_click() -> None:
+    Window.refresh_geometry()
+    Window.coord_manager(*coords.ABILITY_REGULAR_ATTACK)
+
+
+def pixel_check(refresh: bool) -> None:
+    """Translate the three coordinates check_pixel_color() reads."""
+    for offset in (0, -1, 1):
+        if refresh:
+            Window.refresh_geometry()
+        Window.coord_manager(coords.IS_DEAD.x + offset, coords.IS_DEAD.y + offset)
+
+
+def main(seconds: float = 2) -> None:
+    Window.init()
+    xs = numpy.random.randint(0, 960, 1000)
+    ys = numpy.random.randint(0, 600, 1000)
+
+    print(f"{'':<28}{'uncached':>14}{'cached':>14}{'speedup':>10}")
+    rows = [
+        ("clicks", uncached_click, lambda: Window.coord_manager(*coords.ABILITY_REGULAR_ATTACK)),
+        ("check_pixel_color", lambda: pixel_check(True), lambda: pixel_check(False)),
+        ("1000 coords", lambda: [uncached_click() for _ in range(1000)],
+         lambda: Window.coord_manager_many(xs, ys)),
+    ]
+    for name, before, after in rows:
+        old, new = rate(before, seconds), rate(after, seconds)
+        print(f"{name + ' per second':<28}{old:>14,.0f}{new:>14,.0f}{new / old:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 2)
@@ -0,0 +1,94 @@
+"""Measure OCR accuracy and latency on the labelled corpus.
+
+Every crop of the corpus (see benchmarks.ocr_corpus) is prepared with
+every OCR_PROFILE_ of coordinates.py and read by every available engine
+with every page segmentation mode ocr() uses. A read is exact if it
+matches the label, ignoring how whitespace is laid out. The OCR result
+cache isn't involved, every read runs the engine, and nothing needs the
+game window, so this runs anywhere tesseract does.
+
+Prints a row per box and configuration with the exact match rate and the
+latency percentiles of preparing and reading a crop, followed by a summary
+per configuration.
+
+Usage: python -m benchmarks.ocr_accuracy [corpus path] [box name prefix]
+"""
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy
+from PIL import Image
+
+import coordinates as coords
+from benchmarks.ocr_corpus import CORPUS_PATH, load_labels
+from classes.inputs import Inputs
+from classes.ocrengine import OCREngine, PytesseractEngine, TesserocrEngine, tesserocr
+
+PSMS = {"--psm 4": "psm 4", "--psm 6": "psm 6 (sliced)"}
+
+
+def normalize(text: str) -> str:
+    """Return text with all whitespace collapsed into single spaces."""
+    return " ".join(text.split())
+
+
+def percentiles(times: List[float]) -> Tuple[float, float, float]:
+    """Return the 50th, 90th and 99th percentile of times."""
+    return tuple(numpy.percentile(times, [50, 90, 99]))
+
+
+def main(corpus: str = CORPUS_PATH, prefix: str = "") -> None:
+    labels = load_labels(corpus)
+    crops: Dict[str, List[Tuple[Image.Image, str]]] = defaultdict(list)
+    for path, text in sorted(labels.items()):
+        box = path.split("/")[0]
+        if box.startswith(prefix):
+            crops[box].append((Image.open(os.path.join(corpus, path)).convert("RGB"), normalize(text)))
+    if not crops:
+        raise RuntimeError(f"No labelled crops found in {corpus}, see benchmarks.ocr_corpus.")
+
+    profiles = {name[len("OCR_PROFILE_"):].lower(): profile for name, profile in vars(coords).items()
+                if name.startswith("OCR_PROFILE_") and isinstance(profile, coords.OCRProfile)}
+    engines: List[OCREngine] = [PytesseractEngine()]
+    if tesserocr:
+        engines.append(TesserocrEngine())
+
+    # configuration -> exact reads, reads, latencies
+    totals: Dict[Tuple[str, str, str], Tuple[int, int, List[float]]] = {}
+    print(f"{sum(len(c) for c in crops.values())} crops of {len(crops)} boxes\n")
+    print(f"{'box':<28}{'engine':<13}{'profile':<11}{'mode':<16}{'exact':>7}{'p50':>10}{'p90':>10}{'p99':>10}")
+    for box in sorted(crops):
+        for engine in engines:
+            for profile_name, profile in profiles.items():
+                for config, mode in PSMS.items():
+                    engine.image_to_string(Inputs.prepare_ocr(crops[box][0][0], profile), config=config)  # warm up
+                    exact = 0
+                    times = []
+                    for crop, label in crops[box]:
+                        start = time.perf_counter()
+                        text = engine.image_to_string(Inputs.prepare_ocr(crop, profile), config=config)
+                        times.append((time.perf_counter() - start) * 1000)
+                        exact += normalize(text) == label
+
+                    p50, p90, p99 = percentiles(times)
+                    print(f"{box:<28}{engine.name:<13}{profile_name:<11}{mode:<16}{exact / len(times):>7.0%}"
+                          f"{p50:>8.1f}ms{p90:>8.1f}ms{p99:>8.1f}ms")
+                    key = (engine.name, profile_name, mode)
+                    total_exact, total_reads, total_times = totals.get(key, (0, 0, []))
+                    totals[key] = (total_exact + exact, total_reads + len(times), total_times + times)
+
+    print(f"\n{'engine':<13}{'profile':<11}{'mode':<16}{'exact':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'total':>10}")
+    for (engine_name, profile_name, mode), (exact, reads, times) in sorted(totals.items(),
+                                                                           key=lambda item: -item[1][0]):
+        p50, p90, p99 = percentiles(times)
+        print(f"{engine_name:<13}{profile_name:<11}{mode:<16}{exact / reads:>7.0%}"
+              f"{p50:>8.1f}ms{p90:>8.1f}ms{p99:>8.1f}ms{sum(times) / 1000:>9.1f}s")
+    for engine in engines:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else CORPUS_PATH, sys.argv[2] if len(sys.argv) > 2 else "")
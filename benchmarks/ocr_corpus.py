@@ -0,0 +1,79 @@
+"""Build the labelled corpus of OCR crops benchmarks.ocr_accuracy reads.
+
+Every OCR box of coordinates.py is cropped from every recording. For every
+crop that isn't blank you're shown what tesseract reads, type the text the
+game shows or press enter if it's right. Type "-" to skip a crop. Crops
+are saved to CORPUS_PATH/<box>/<recording>.png and their text to
+CORPUS_PATH/labels.json. Crops that are already labelled are skipped, so
+the corpus can be extended with new recordings later.
+
+Usage: python -m benchmarks.ocr_corpus [recording path] [corpus path]
+
+The recording path defaults to REPLAY_PATH, see "Replaying recorded
+frames" in the README.
+"""
+import json
+import os
+import sys
+from typing import Dict
+
+from PIL import Image
+
+import coordinates as coords
+import usersettings as userset
+from classes.framesource import ReplayFrameSource
+from classes.inputs import Inputs
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_corpus")
+
+
+def ocr_boxes() -> Dict[str, coords.OCRBox]:
+    """Return every OCR box of coordinates.py by name."""
+    return {name: box for name, box in vars(coords).items()
+            if name.startswith("OCR_") and isinstance(box, coords.OCRBox)}
+
+
+def load_labels(corpus: str) -> Dict[str, str]:
+    """Return the text of every crop in the corpus by its path relative to it."""
+    path = os.path.join(corpus, "labels.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(recordings: str = None, corpus: str = CORPUS_PATH) -> None:
+    source = ReplayFrameSource(recordings or userset.REPLAY_PATH)
+    labels = load_labels(corpus)
+    engine = Inputs.get_ocr_engine()
+
+    for index, file in enumerate(source.files):
+        source.seek(index)
+        frame = Image.fromarray(source.capture()[:, :, 2::-1])
+        stem = os.path.splitext(os.path.basename(file))[0]
+        print(file)
+        for name, box in sorted(ocr_boxes().items()):
+            crop_path = f"{name}/{stem}.png"
+            if crop_path in labels:
+                continue
+            # Bitmaps are created with a 8px border
+            crop = frame.crop((box.x1 + 8, box.y1 + 8, box.x2 + 8, box.y2 + 8))
+            if not crop.getbbox():
+                continue
+            suggestion = engine.image_to_string(Inputs.prepare_ocr(crop, coords.OCR_PROFILE_DEFAULT),
+                                                config="--psm 4")
+            suggestion = " ".join(suggestion.split())
+            text = input(f"{name} [{suggestion}]: ").strip() or suggestion
+            if text in ("", "-"):
+                continue
+
+            os.makedirs(os.path.join(corpus, name), exist_ok=True)
+            crop.save(os.path.join(corpus, crop_path))
+            labels[crop_path] = text
+            with open(os.path.join(corpus, "labels.json"), "w") as f:
+                json.dump(labels, f, indent=1, sort_keys=True)
+    engine.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None, sys.argv[2] if len(sys.argv) > 2 else CORPUS_PATH)
@@ -0,0 +1,64 @@
+"""Compare the latency of the OCR engines on recorded crops.
+
+Every OCR box of coordinates.py is cropped from every recording and read
+by each available engine after Inputs.prepare_ocr() with the default
+profile. The OCR result cache is bypassed, every read runs the engine.
+
+Usage: python -m benchmarks.ocr_engines [recording path]
+
+The recording path defaults to REPLAY_PATH, see "Replaying recorded
+frames" in the README.
+"""
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from PIL import Image
+
+import coordinates as coords
+import usersettings as userset
+from classes.framesource import ReplayFrameSource
+from classes.inputs import Inputs
+from classes.ocrengine import OCREngine, PytesseractEngine, TesserocrEngine, tesserocr
+
+
+def main(recordings: str = None) -> None:
+    source = ReplayFrameSource(recordings or userset.REPLAY_PATH)
+    boxes = {name: box for name, box in vars(coords).items()
+             if name.startswith("OCR_") and isinstance(box, coords.OCRBox)}
+    engines: List[OCREngine] = [PytesseractEngine()]
+    if tesserocr:
+        engines.append(TesserocrEngine())
+
+    crops: Dict[str, List[Image.Image]] = {name: [] for name in boxes}
+    for index in range(len(source.files)):
+        source.seek(index)
+        frame = Image.fromarray(source.capture()[:, :, 2::-1])
+        for name, box in boxes.items():
+            # Bitmaps are created with a 8px border
+            crop = frame.crop((box.x1 + 8, box.y1 + 8, box.x2 + 8, box.y2 + 8))
+            if crop.getbbox():
+                crops[name].append(Inputs.prepare_ocr(crop, coords.OCR_PROFILE_DEFAULT))
+
+    print(f"{len(source.files)} recordings\n")
+    print(f"{'box':<28}" + "".join(f"{engine.name:>14}" for engine in engines))
+    for name in sorted(boxes):
+        if not crops[name]:
+            continue
+        row = f"{name:<28}"
+        for engine in engines:
+            engine.image_to_string(crops[name][0], config="--psm 4")  # warm up
+            times = []
+            for crop in crops[name]:
+                start = time.perf_counter()
+                engine.image_to_string(crop, config="--psm 4")
+                times.append((time.perf_counter() - start) * 1000)
+            row += f"{statistics.median(times):>12.1f}ms"
+        print(row)
+    for engine in engines:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
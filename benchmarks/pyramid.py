@@ -0,0 +1,69 @@
+"""Compare exhaustive and pyramid image_search on recorded screenshots.
+
+Every picture in images/ is searched for in the whole window of every
+recording, the way transform_slot() and the questing scans search. Parity
+counts the searches where both modes agree on hit or miss, "same" the
+searches that also returned the same location. Every location pyramid
+mode returns is scored at full resolution, so with several copies of an
+item on screen it may pick a different copy than the exhaustive search.
+
+Usage: python -m benchmarks.pyramid [recording path] [threshold]
+
+The recording path defaults to REPLAY_PATH, see "Replaying recorded
+frames" in the README. Record inventory pages with
+Inputs.save_screenshot(full=True).
+"""
+import glob
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import usersettings as userset
+from classes.frame import Frame
+from classes.framesource import ReplayFrameSource
+from classes.inputs import Inputs
+from classes.window import Window
+
+
+def search(path: str, threshold: float, pyramid: int) -> Tuple[float, Optional[Tuple[int, int]]]:
+    """Return the latency in milliseconds and the result of one search."""
+    start = time.perf_counter()
+    loc = Inputs.image_search(Window.x, Window.y, Window.x + 960, Window.y + 600, path, threshold, pyramid=pyramid)
+    return (time.perf_counter() - start) * 1000, loc
+
+
+def main(recordings: str = None, threshold: float = 0.9) -> None:
+    Window.source = ReplayFrameSource(recordings or userset.REPLAY_PATH)
+    Window.refresh_geometry()
+    frames = len(Window.source.files)
+    pictures = sorted(glob.glob(Inputs.get_file_path("images", "*.png")))
+
+    print(f"{frames} recordings, threshold {threshold}\n")
+    print(f"{'picture':<22}{'exhaustive':>12}{'x2':>10}{'parity':>8}{'same':>6}{'x4':>10}{'parity':>8}{'same':>6}")
+    for path in pictures:
+        times: Dict[int, List[float]] = {1: [], 2: [], 4: []}
+        agree = {2: 0, 4: 0}
+        same = {2: 0, 4: 0}
+        for index in range(frames):
+            Window.source.seek(index)
+            Frame.invalidate()
+            Frame.get()  # keep the capture out of the measurement
+            exhaustive_ms, expected = search(path, threshold, 1)
+            times[1].append(exhaustive_ms)
+            for pyramid in (2, 4):
+                ms, loc = search(path, threshold, pyramid)
+                times[pyramid].append(ms)
+                agree[pyramid] += (loc is None) == (expected is None)
+                same[pyramid] += loc == expected
+        base = statistics.median(times[1])
+        row = f"{os.path.basename(path):<22}{base:>10.2f}ms"
+        for pyramid in (2, 4):
+            row += f"{base / statistics.median(times[pyramid]):>9.2f}x{agree[pyramid] / frames:>8.0%}"
+            row += f"{same[pyramid] / frames:>6.0%}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None, float(sys.argv[2]) if len(sys.argv) > 2 else 0.9)
@@ -0,0 +1,30 @@
+"""Learn the glyphs of the game's UI font for reading numbers.
+
+Open a menu with one of the fields in coordinates.GLYPH_FIELDS and run
+this, or set FRAME_SOURCE = "replay" to go through every recording in
+REPLAY_PATH. For every field you're shown what tesseract reads, type the
+text the game shows or press enter if it's right. Type "-" to skip.
+"""
+from classes.frame import Frame
+from classes.glyphs import Glyphs
+from classes.inputs import Inputs
+from classes.window import Window
+import coordinates as coords
+import usersettings as userset
+
+Window.init()
+recordings = len(Window.source.files) if userset.FRAME_SOURCE == "replay" else 1
+for index in range(recordings):
+    if userset.FRAME_SOURCE == "replay":
+        Window.source.seek(index)
+        Frame.invalidate()
+        print(Window.source.files[index])
+    for name, box in coords.GLYPH_FIELDS.items():
+        suggestion = Inputs.ocr(*box).strip()
+        text = input(f"{name} [{suggestion}]: ").strip() or suggestion
+        if text in ("", "-"):
+            continue
+        try:
+            print(f"Learned {Glyphs.learn(*box, text)} glyphs")
+        except ValueError as e:
+            print(e)
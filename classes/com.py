@@ -1,5 +1,6 @@
 import struct
 
+from classes.frame import Frame
 from classes.window import Window
 
 
@@ -30,7 +31,9 @@ class Com:
     @staticmethod
     def sync() -> None:
         """Wait for pipe server to complete last command"""
+        """Any command might change what's on screen, so the cached frame is dropped"""
         Com.pipe.write(struct.pack('<b', 0xc))
+        Frame.invalidate()
 
     @staticmethod
     def set_cur_pos(x: int, y: int) -> None:
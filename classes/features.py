@@ -7,6 +7,7 @@ import time
 from collections import deque, namedtuple
 from typing import Dict, List, Tuple
 
+import numpy
 from PIL.Image import Image as PILImage
 from deprecated import deprecated
 
@@ -23,7 +24,7 @@ class FightBoss:
     def get_current_boss() -> int:
         """Go to fight and read current boss number."""
         Navigation.menu("fight")
-        boss = Inputs.ocr(*coords.OCR_BOSS, debug=False)
+        boss = Inputs.ocr(*coords.OCR_BOSS, profile=coords.OCR_PROFILE_NUMBER)
         return Inputs.remove_letters(boss)
 
     @staticmethod
@@ -219,15 +220,12 @@ class Adventure:
             if not Inputs.check_pixel_color(*coords.IS_DEAD):
                 if bosses:
                     if Inputs.check_pixel_color(*coords.IS_BOSS_CROWN):
-                        enemy_alive = True
                         if manual:
                             Adventure.kill_enemy()
                         else:
-                            while enemy_alive:
-                                enemy_alive = not Inputs.check_pixel_color(*coords.IS_DEAD)
-                                if Inputs.check_pixel_color(*coords.COLOR_REGULAR_ATTACK_READY):
+                            while not Inputs.check_pixel_color(*coords.IS_DEAD):
+                                if Inputs.wait_for(coords.COLOR_REGULAR_ATTACK_READY, timeout=1) is not None:
                                     Inputs.click(*coords.ABILITY_REGULAR_ATTACK)
-                                time.sleep(0.1)
                         if once:
                             break
                     else:
@@ -290,14 +288,11 @@ class Adventure:
     @staticmethod
     def kill_enemy() -> None:
         """Attempt to kill enemy in adventure using abilities."""
-        start = time.time()
         if Inputs.check_pixel_color(*coords.IS_IDLE):
             Inputs.click(*coords.ABILITY_IDLE_MODE)
-        while Inputs.check_pixel_color(*coords.IS_DEAD):
-            time.sleep(.1)
-            if time.time() > start + 5:
-                print("Couldn't detect enemy in kill_enemy()")
-                return
+        if Inputs.wait_for(coords.IS_DEAD, present=False, timeout=5) is None:
+            print("Couldn't detect enemy in kill_enemy()")
+            return
         queue = deque(Adventure.get_ability_queue())
         while not Inputs.check_pixel_color(*coords.IS_DEAD):
             if not queue:
@@ -317,13 +312,7 @@ class Adventure:
 
             Inputs.click(x, y)
             time.sleep(userset.LONG_SLEEP)
-            color = Inputs.get_pixel_color(coords.ABILITY_ROW1X,
-                                           coords.ABILITY_ROW1Y)
-
-            while color != coords.ABILITY_ROW1_READY_COLOR:
-                time.sleep(0.03)
-                color = Inputs.get_pixel_color(coords.ABILITY_ROW1X,
-                                               coords.ABILITY_ROW1Y)
+            Inputs.wait_for(coords.COLOR_ABILITY_ROW1_READY, timeout=10)
 
     @staticmethod
     def check_titan_status() -> List[int]:
@@ -403,12 +392,9 @@ class Adventure:
             Inputs.click(*coords.RIGHT_ARROW)
         Adventure.current_adventure_zone = const.TITAN_ZONE[target - 1]
         time.sleep(userset.LONG_SLEEP)
-        start = time.time()
-        while Inputs.check_pixel_color(*coords.IS_DEAD):  # wait for titan to spawn
-            time.sleep(0.05)
-            if time.time() > start + 5:
-                print("Couldn't detect enemy in kill_titan()")
-                return
+        if Inputs.wait_for(coords.IS_DEAD, present=False, timeout=5) is None:  # wait for titan to spawn
+            print("Couldn't detect enemy in kill_titan()")
+            return
 
         queue = deque(Adventure.get_ability_queue())
         while not Inputs.check_pixel_color(*coords.IS_DEAD):
@@ -430,13 +416,7 @@ class Adventure:
 
             Inputs.click(x, y)
             time.sleep(userset.LONG_SLEEP)
-            color = Inputs.get_pixel_color(coords.ABILITY_ROW1X,
-                                           coords.ABILITY_ROW1Y)
-
-            while color != coords.ABILITY_ROW1_READY_COLOR:
-                time.sleep(0.05)
-                color = Inputs.get_pixel_color(coords.ABILITY_ROW1X,
-                                               coords.ABILITY_ROW1Y)
+            Inputs.wait_for(coords.COLOR_ABILITY_ROW1_READY, timeout=10)
 
     @staticmethod
     def get_ability_queue() -> List[int]:
@@ -706,34 +686,22 @@ class Augmentation:
             Misc.set_input(val)
             # Scroll down if we have to.
             bottom_augments = ["AE", "ES", "LS", "QSL"]
-            i = 0
             if k in bottom_augments:
-                color = Inputs.get_pixel_color(*coords.AUG_SCROLL_SANITY_BOT)
-                while color not in coords.SANITY_AUG_SCROLL_COLORS:
-                    Inputs.click(*coords.AUG_SCROLL_BOT)
-                    time.sleep(userset.MEDIUM_SLEEP)
-                    color = Inputs.get_pixel_color(*coords.AUG_SCROLL_SANITY_BOT)
-                    i += 1
-                    if i > 5 and i <= 10:  # Safeguard if something goes wrong with augs
-                        Navigation.current_menu = ""
-                        Navigation.menu("augmentations")
-                    elif i > 10:
-                        print("Couldn't assign augments")
-                        break
-
+                scroll, scrolled = coords.AUG_SCROLL_BOT, coords.IS_AUG_SCROLLED_BOT
             else:
-                color = Inputs.get_pixel_color(*coords.AUG_SCROLL_SANITY_TOP)
-                while color not in coords.SANITY_AUG_SCROLL_COLORS:
-                    Inputs.click(*coords.AUG_SCROLL_TOP)
-                    time.sleep(userset.MEDIUM_SLEEP)
-                    color = Inputs.get_pixel_color(*coords.AUG_SCROLL_SANITY_TOP)
-                    i += 1
-                    if i > 5 and i <= 10:  # Safeguard if something goes wrong with augs
-                        Navigation.current_menu = ""
-                        Navigation.menu("augmentations")
-                    elif i > 10:
-                        print("Couldn't assign augments")
-                        break
+                scroll, scrolled = coords.AUG_SCROLL_TOP, coords.IS_AUG_SCROLLED_TOP
+            i = 0
+            while not Inputs.check_pixel_color(*scrolled):
+                Inputs.click(*scroll)
+                if Inputs.wait_for(scrolled, timeout=userset.MEDIUM_SLEEP) is not None:
+                    break
+                i += 1
+                if i > 5 and i <= 10:  # Safeguard if something goes wrong with augs
+                    Navigation.current_menu = ""
+                    Navigation.menu("augmentations")
+                elif i > 10:
+                    print("Couldn't assign augments")
+                    break
             Inputs.click(*coords.AUGMENT[k])
 
 
@@ -869,21 +837,12 @@ class BloodMagic:
         """
         if Inputs.check_pixel_color(*coords.COLOR_SPELL_READY):
             Navigation.spells()
-            Inputs.click(*coords.BM_PILL, button="right")
-            spells = []
-            res = Inputs.ocr(*coords.OCR_BM_SPELL_TEXT)
-            if "cooldown: 0.0s" in res.lower():
-                spells.append(1)
-
-            Inputs.click(*coords.BM_GUFFIN_A, button="right")
-            res = Inputs.ocr(*coords.OCR_BM_SPELL_TEXT)
-            if "cooldown: 0.0s" in res.lower():
-                spells.append(2)
-
-            Inputs.click(*coords.BM_GUFFIN_B, button="right")
-            res = Inputs.ocr(*coords.OCR_BM_SPELL_TEXT)
-            if "cooldown: 0.0s" in res.lower():
-                spells.append(3)
+            bmps = []
+            for spell in (coords.BM_PILL, coords.BM_GUFFIN_A, coords.BM_GUFFIN_B):
+                Inputs.click(*spell, button="right")
+                bmps.append(Inputs.get_bitmap())
+            texts = Inputs.ocr_batch([coords.OCR_BM_SPELL_TEXT] * len(bmps), bmps=bmps)
+            spells = [i for i, res in enumerate(texts, 1) if "cooldown: 0.0s" in res.lower()]
 
             return spells
         else:
@@ -1178,11 +1137,11 @@ class Questing:
         """Check for items in inventory that can be turned in."""
         Navigation.menu("inventory")
         Inputs.click(*coords.INVENTORY_PAGE[0])
-        bmp = Inputs.get_bitmap()
-        for item in coords.QUESTING_FILENAMES:
-            path = Inputs.get_file_path("images", item)
-            loc = Inputs.image_search(Window.x, Window.y, Window.x + 960, Window.y + 600, path, 0.91, bmp=bmp)
-            if loc:
+        paths = [Inputs.get_file_path("images", item) for item in coords.QUESTING_FILENAMES]
+        matches = Inputs.match_templates(paths, coords.INVENTORY_AREA, 0.91)
+        for path in paths:
+            if matches[path]:
+                loc = matches[path][0]
                 Inputs.click(*loc, button="right")
                 if cleanup:
                     Inputs.send_string("d")
@@ -1298,14 +1257,14 @@ class Questing:
                     current_time = time.time()
                     if coords.QUESTING_QUEST_COMPLETE in text.lower():
                         try:
-                            start_qp = int(Inputs.remove_letters(Inputs.ocr(*coords.OCR_QUESTING_QP)))
+                            start_qp = Inputs.ocr_number(*coords.OCR_QUESTING_QP)
                         except ValueError:
                             print("Couldn't fetch current QP")
                             start_qp = 0
                         Questing.start_complete()
                         Inputs.click(605, 510)  # move tooltip
                         try:
-                            current_qp = int(Inputs.remove_letters(Inputs.ocr(*coords.OCR_QUESTING_QP)))
+                            current_qp = Inputs.ocr_number(*coords.OCR_QUESTING_QP)
                         except ValueError:
                             print("Couldn't fetch current QP")
                             current_qp = 0
@@ -1377,7 +1336,7 @@ class SelloutShop:
             print(muffin_status)
             if buy:
                 try:
-                    ap = int(Inputs.remove_letters(Inputs.ocr(*coords.OCR_AP)))
+                    ap = Inputs.ocr_number(*coords.OCR_AP)
                 except ValueError:
                     print("Couldn't get current AP")
                 if ap >= 50000:
@@ -1400,6 +1359,7 @@ class Rebirth:
         Inputs.click(*coords.FIGHT_STOP)
         Navigation.rebirth()
         Adventure.current_adventure_zone = 0
+        Misc.clear_breakdowns()
         Inputs.click(*coords.REBIRTH)
         Inputs.click(*coords.REBIRTH_BUTTON)
         Inputs.click(*coords.CONFIRM)
@@ -1495,7 +1455,14 @@ class Rebirth:
         return seconds
 
 
+# power, bars and cap of a resource, see Misc.get_breakdown()
+ResourceBreakdown = namedtuple("ResourceBreakdown", "power bars cap")
+
+
 class Misc:
+    # the last complete read of each resource's stat breakdown and when it was read
+    breakdowns: Dict[int, Tuple[ResourceBreakdown, float]] = {}
+
     @staticmethod
     def reclaim_all() -> None:
         """Reclaim all resources from all features."""
@@ -1582,45 +1549,38 @@ class Misc:
     # crops the misc breakdown image, cutting off empty space on the right
     @staticmethod
     def __cutoff_right(bmp) -> PILImage:
-        first_pix = bmp.getpixel((0, 0))
+        pixels = numpy.asarray(bmp)[:, :, :3]
         width, height = bmp.size
 
-        count = 0
-        for x in range(8, width):
-            dif = False
-            for y in range(0, height):
-                if not Inputs.rgb_equal(first_pix, bmp.getpixel((x, y))):
-                    dif = True
-                    break
-
-            if dif:
-                count = 0
-            else:
-                count += 1
-                if count > 8:
-                    return bmp.crop((0, 0, x, height))
+        # Cut at the 9th column in a row, from x=8 on, that is all background
+        blank = ~(pixels != pixels[0, 0]).any(axis=(0, 2))[8:]
+        if blank.size >= 9:
+            runs = numpy.convolve(blank, numpy.ones(9, dtype=int), mode="valid")
+            if (runs == 9).any():
+                return bmp.crop((0, 0, int(runs.argmax()) + 16, height))
 
         return bmp
 
     # splits the three parts of the resource breakdown (pow, bars, cap)
     @staticmethod
     def __split_breakdown(bmp) -> List[PILImage]:
-        first_pix = bmp.getpixel((0, 0))
+        pixels = numpy.asarray(bmp)[:, :, :3]
         width, height = bmp.size
-        y1 = 1
+        y0 = y1 = 1
         offset_x = coords.OCR_BREAKDOWN_NUM[0] - coords.OCR_BREAKDOWN_COLONS[0]
 
+        # Rows where the first column isn't background
+        text = (pixels[:, 0] != pixels[0, 0]).any(axis=1)
         slices = []
         for _ in range(0, 3):
-            for y in range(y1, height):
-                if not Inputs.rgb_equal(first_pix, bmp.getpixel((0, y))):
-                    y0 = y
-                    break
+            # The first row of text
+            if text[y1:].any():
+                y0 = y1 + int(text[y1:].argmax())
 
-            for y in range(y0, height, coords.BREAKDOWN_OFFSET_Y):
-                if Inputs.rgb_equal(first_pix, bmp.getpixel((0, y))):
-                    y1 = y
-                    break
+            # The first background row after it, going down a line at a time
+            lines = ~text[y0::coords.BREAKDOWN_OFFSET_Y]
+            if lines.any():
+                y1 = y0 + int(lines.argmax()) * coords.BREAKDOWN_OFFSET_Y
 
             slice = bmp.crop((offset_x, y0 - 8, width, y1))
             slices.append(Misc.__cutoff_right(slice))
@@ -1650,22 +1610,72 @@ class Misc:
 
         imgs = Misc.__split_breakdown(bmp)
 
+        if debug:
+            for img in imgs:
+                img.show()
+        if ocrDebug:
+            texts = [Inputs.ocr(0, 0, 0, 0, bmp=img, debug=True, sliced=True,
+                                profile=coords.OCR_PROFILE_BREAKDOWN) for img in imgs]
+        else:
+            texts = Inputs.ocr_batch([(0, 0, 0, 0)] * len(imgs), bmps=imgs, cropb=False, sliced=True,
+                                      profile=coords.OCR_PROFILE_BREAKDOWN)
+
         ress = []
-        for img in imgs:
-            if debug: img.show()
-            s = Inputs.ocr(0, 0, 0, 0, bmp=img, debug=ocrDebug, binf=220, sliced=True)
+        for s in texts:
             s = s.splitlines()
             s2 = [x for x in s if x != ""]  # remove empty lines
             ress.append(s2)
 
         return ress
 
+    @staticmethod
+    def get_breakdown(resource: int) -> ResourceBreakdown:
+        """Get the power, bars and cap of energy, magic, or resource 3.
+
+        All three are read from the stat breakdown at once and kept for
+        usersettings.BREAKDOWN_TTL seconds. Values that couldn't be read are
+        None, and a breakdown missing any isn't kept. Code that buys power,
+        bars or cap must call clear_breakdowns() or refresh_breakdown()
+        afterwards, like UpgradeEM and UpgradeHackPower do, or this returns
+        the values from before the purchase until they expire.
+
+        Keyword arguments
+        resource -- The resource to get the breakdown for. 1 for energy, 2 for magic and 3 for r3.
+        """
+        if resource in Misc.breakdowns:
+            breakdown, read_at = Misc.breakdowns[resource]
+            if time.time() - read_at < userset.BREAKDOWN_TTL:
+                return breakdown
+        return Misc.refresh_breakdown(resource)
+
+    @staticmethod
+    def refresh_breakdown(resource: int) -> ResourceBreakdown:
+        """Read the breakdown of a resource again, see get_breakdown()."""
+        values = []
+        for lines in Misc.__get_res_breakdown(resource):
+            numbers = Inputs.get_numbers(lines[-1]) if lines else []
+            values.append(numbers[0] if numbers else None)
+        breakdown = ResourceBreakdown(*values)
+
+        if None in breakdown:
+            Misc.breakdowns.pop(resource, None)
+        else:
+            Misc.breakdowns[resource] = breakdown, time.time()
+        return breakdown
+
+    @staticmethod
+    def clear_breakdowns() -> None:
+        """Forget all breakdowns, the next get_breakdown() reads them again."""
+        Misc.breakdowns.clear()
+
     # Gets the numbers on stats breakdown for the resource and value passed
     # val = 0 for power, 1 for bars and 2 for cap
     @staticmethod
     def __get_res_val(resource, val) -> int:
-        s = Misc.__get_res_breakdown(resource)[val][-1]
-        return Inputs.get_numbers(s)[0]
+        value = Misc.get_breakdown(resource)[val]
+        if value is None:
+            raise IndexError(f"Couldn't read {ResourceBreakdown._fields[val]} of resource {resource}")
+        return value
 
     @staticmethod
     def get_pow(resource: int) -> int:
@@ -1704,11 +1714,11 @@ class Misc:
         try:  # The sliced argument was meant for low values with get_pow/bars/cap
             # But also serves for low idle caps
             if resource == 1:
-                res = Inputs.ocr(*coords.OCR_ENERGY, sliced=True)
+                res = Inputs.ocr_digits(*coords.OCR_ENERGY, sliced=True, profile=coords.OCR_PROFILE_NUMBER)
             elif resource == 2:
-                res = Inputs.ocr(*coords.OCR_MAGIC, sliced=True)
+                res = Inputs.ocr_digits(*coords.OCR_MAGIC, sliced=True, profile=coords.OCR_PROFILE_NUMBER)
             elif resource == 3:
-                res = Inputs.ocr(*coords.OCR_R3, sliced=True)
+                res = Inputs.ocr_digits(*coords.OCR_R3, sliced=True, profile=coords.OCR_PROFILE_NUMBER)
             else:
                 raise RuntimeError("Invalid resource")
 
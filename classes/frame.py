@@ -0,0 +1,211 @@
+"""Frame class caches captures of the game window."""
+import threading
+import time
+from collections import deque
+from typing import Dict, Tuple
+
+import numpy
+
+import usersettings as userset
+from classes.window import Window
+
+
+class Frame:
+    """This class caches the latest capture of the game window.
+
+    All pixel reads are served from a single capture until it is
+    invalidated by an input (every Com command does this) or it gets older
+    than userset.FRAME_TTL seconds.
+
+    Frames come from Window.source (see classes.framesource) and are handed
+    out as views of its memory without copying. A frame is only valid until
+    the next capture, copy it if you need to keep it around.
+
+    Optionally a worker thread keeps capturing in the background, see
+    start_worker(). Reads are then served from its ring buffer instead.
+    """
+
+    array = None
+    timestamp = 0.0
+    invalidated = 0.0
+
+    # capture worker, see start_worker()
+    __worker = None
+    __running = False
+    __ring = deque()
+    __new_frame = threading.Condition()
+
+    # counters
+    captures = 0
+    reads = 0
+    hits = 0
+
+    @staticmethod
+    def capture_bgrx() -> numpy.ndarray:
+        """Capture the whole window and return the raw BGRX memory.
+
+        The returned array belongs to the frame source, for the live window
+        it is a writable view of the capture bitmap that is overwritten by the
+        next capture.
+        """
+        return Window.source.capture()
+
+    @staticmethod
+    def capture() -> numpy.ndarray:
+        """Capture the whole window and cache it as an RGB array.
+
+        If the capture worker is running this waits for its next frame.
+        """
+        if Frame.__worker is not None:
+            return Frame.__latest(time.perf_counter())
+
+        start = time.perf_counter()
+        # Flip the first three channels of the BGRX memory to get a RGB view
+        array = Frame.capture_bgrx()[:, :, 2::-1]
+        array.flags.writeable = False
+        Window.check_geometry(array.shape[1::-1])
+
+        Frame.array = array
+        Frame.timestamp = start
+        Frame.captures += 1
+        return array
+
+    @staticmethod
+    def start_worker(rate: float = None) -> None:
+        """Start capturing frames in a background thread.
+
+        Frames are copied into a ring of userset.CAPTURE_BUFFER preallocated
+        arrays, so a frame stays valid for that many captures. Reads use the
+        newest frame if it was captured after the last invalidation and is
+        younger than userset.FRAME_TTL, otherwise they wait for the next one.
+
+        Keyword arguments
+        rate -- Captures per second, defaults to userset.CAPTURE_RATE.
+        """
+        if Frame.__worker is not None:
+            return
+        interval = 1 / (rate or userset.CAPTURE_RATE)
+        Frame.__running = True
+        Frame.__ring = deque(maxlen=userset.CAPTURE_BUFFER)
+        Frame.__worker = threading.Thread(target=Frame.__work, args=(interval,), daemon=True)
+        Frame.__worker.start()
+
+    @staticmethod
+    def stop_worker() -> None:
+        """Stop the capture worker and go back to capturing on demand."""
+        if Frame.__worker is None:
+            return
+        Frame.__running = False
+        Frame.__worker.join()
+        Frame.__worker = None
+        Frame.__ring.clear()
+        Frame.array = None
+
+    @staticmethod
+    def __work(interval: float) -> None:
+        """Capture frames every interval seconds until stop_worker() is called."""
+        slots = []
+        index = 0
+        while Frame.__running:
+            start = time.perf_counter()
+            bgrx = Frame.capture_bgrx()
+            shape = bgrx.shape[:2] + (3,)
+            if len(slots) < userset.CAPTURE_BUFFER:
+                slots.append(numpy.empty(shape, dtype=numpy.uint8))
+            elif slots[index].shape != shape:
+                slots[index] = numpy.empty(shape, dtype=numpy.uint8)
+            slot = slots[index]
+            numpy.copyto(slot, bgrx[:, :, 2::-1])
+            Window.check_geometry(shape[1::-1])
+            index = (index + 1) % userset.CAPTURE_BUFFER
+
+            array = slot.view()
+            array.flags.writeable = False
+            with Frame.__new_frame:
+                Frame.__ring.append((start, array))
+                Frame.captures += 1
+                Frame.__new_frame.notify_all()
+            time.sleep(max(interval - (time.perf_counter() - start), 0))
+
+    @staticmethod
+    def __latest(newer_than: float) -> numpy.ndarray:
+        """Return the newest frame of the worker captured after newer_than.
+
+        Frames captured before the last invalidation are never used. Waits
+        for the worker if there's no such frame yet.
+        """
+        with Frame.__new_frame:
+            while True:
+                if Frame.__ring:
+                    timestamp, array = Frame.__ring[-1]
+                    if timestamp >= max(newer_than, Frame.invalidated):
+                        break
+                if not Frame.__new_frame.wait(1) and not Frame.__worker.is_alive():
+                    raise RuntimeError("Capture worker stopped.")
+        Frame.array = array
+        Frame.timestamp = timestamp
+        return array
+
+    @staticmethod
+    def capture_region(x1: int, y1: int, x2: int, y2: int) -> numpy.ndarray:
+        """Return the area x1, y1, x2, y2 of the window as an RGB array.
+
+        Coordinates are in window pixels, including the borders. The area is
+        a view of the cached frame, so nothing outside of it is ever copied.
+        """
+        return Frame.get()[max(y1, 0):y2, max(x1, 0):x2]
+
+    @staticmethod
+    def __is_fresh() -> bool:
+        """Check if the cached frame can still be used."""
+        return Frame.array is not None and time.perf_counter() - Frame.timestamp <= userset.FRAME_TTL
+
+    @staticmethod
+    def get() -> numpy.ndarray:
+        """Return the cached frame, capturing a new one if it's stale."""
+        if Frame.__worker is not None:
+            return Frame.__latest(time.perf_counter() - userset.FRAME_TTL)
+        if not Frame.__is_fresh():
+            return Frame.capture()
+        return Frame.array
+
+    @staticmethod
+    def get_pixel(x: int, y: int) -> Tuple[int, int, int]:
+        """Return the RGB value of the pixel at window coordinates x, y."""
+        Frame.reads += 1
+        if Frame.__is_fresh():
+            Frame.hits += 1
+        r, g, b = Frame.get()[y, x]
+        return int(r), int(g), int(b)
+
+    @staticmethod
+    def get_pixels(xs: numpy.ndarray, ys: numpy.ndarray) -> numpy.ndarray:
+        """Return the RGB values of all pixels at window coordinates xs, ys.
+
+        The result has the shape of xs with a trailing axis for the channels.
+        """
+        Frame.reads += xs.size
+        Frame.hits += xs.size if Frame.__is_fresh() else xs.size - 1
+        return Frame.get()[ys, xs]
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the cached frame, the next read will capture a new one."""
+        Frame.array = None
+        Frame.invalidated = time.perf_counter()
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        """Return the cache counters.
+
+        Every pixel read served from an existing frame is a GetWindowDC,
+        GetPixel and ReleaseDC round-trip that didn't have to be made.
+        """
+        return {"captures": Frame.captures, "reads": Frame.reads, "saved": Frame.hits}
+
+    @staticmethod
+    def reset_stats() -> None:
+        """Reset the cache counters."""
+        Frame.captures = 0
+        Frame.reads = 0
+        Frame.hits = 0
@@ -0,0 +1,210 @@
+"""Frame sources provide the pixels and geometry of the game window."""
+import ctypes
+import glob
+import os
+from ctypes import wintypes
+from typing import List, Optional, Tuple
+
+import numpy
+from PIL import Image
+
+try:
+    import win32gui
+except ImportError:  # Replaying recorded frames works without pywin32
+    win32gui = None
+
+BI_RGB = 0
+DIB_RGB_COLORS = 0
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    """Header of a device independent bitmap."""
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+
+class FrameSource:
+    """Base class for everything frames can be captured from.
+
+    Frames are BGRX arrays of the whole window, borders included, in the
+    same layout PrintWindow produces.
+    """
+
+    def capture(self) -> numpy.ndarray:
+        """Capture the whole window and return it as a BGRX array."""
+        raise NotImplementedError
+
+    def get_rect_size(self) -> Tuple[int, int]:
+        """Returns the resolution of the whole rect"""
+        raise NotImplementedError
+
+    def get_rect_size_client(self) -> Tuple[int, int]:
+        """Returns the resolution of the game window"""
+        raise NotImplementedError
+
+    def release(self) -> None:
+        """Free any resources held by the source."""
+
+
+class Win32FrameSource(FrameSource):
+    """Captures the live game window with PrintWindow.
+
+    The window is printed into a DIB section that is kept alive between
+    captures and only rebuilt when the window size changes. Captures are
+    views of its memory, so they are overwritten by the next capture.
+    """
+
+    def __init__(self, hwnd: int) -> None:
+        self.hwnd = hwnd
+        self.size = None
+        self.dc = None
+        self.dib = None
+        # the bitmap the DC was created with, selected back before deleting the DIB
+        self.old_bitmap = None
+        self.bgrx = None
+
+        self.gdi32 = ctypes.windll.gdi32
+        self.user32 = ctypes.windll.user32
+        self.gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        self.gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        self.gdi32.CreateDIBSection.argtypes = [wintypes.HDC, ctypes.POINTER(BITMAPINFOHEADER), wintypes.UINT,
+                                                ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD]
+        self.gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+        self.gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        self.gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        self.gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        self.gdi32.DeleteDC.argtypes = [wintypes.HDC]
+        self.user32.GetWindowDC.argtypes = [wintypes.HWND]
+        self.user32.GetWindowDC.restype = wintypes.HDC
+        self.user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        self.user32.PrintWindow.argtypes = [wintypes.HWND, wintypes.HDC, wintypes.UINT]
+
+    def __build_context(self, width: int, height: int) -> None:
+        """Create the memory DC and the DIB section the window is printed into."""
+        self.release()
+        hwnd_dc = self.user32.GetWindowDC(self.hwnd)
+        self.dc = self.gdi32.CreateCompatibleDC(hwnd_dc)
+        self.user32.ReleaseDC(self.hwnd, hwnd_dc)
+
+        # A negative height makes the bitmap top-down, so rows are in screen order
+        header = BITMAPINFOHEADER(biSize=ctypes.sizeof(BITMAPINFOHEADER), biWidth=width, biHeight=-height,
+                                  biPlanes=1, biBitCount=32, biCompression=BI_RGB)
+        bits = ctypes.c_void_p()
+        self.dib = self.gdi32.CreateDIBSection(self.dc, ctypes.byref(header), DIB_RGB_COLORS,
+                                               ctypes.byref(bits), None, 0)
+        if not self.dib:
+            raise RuntimeError("Couldn't create capture bitmap.")
+        self.old_bitmap = self.gdi32.SelectObject(self.dc, self.dib)
+
+        buffer = (ctypes.c_uint8 * (width * height * 4)).from_address(bits.value)
+        self.bgrx = numpy.frombuffer(buffer, dtype=numpy.uint8).reshape((height, width, 4))
+        self.size = (width, height)
+
+    def capture(self) -> numpy.ndarray:
+        """Capture the whole window and return it as a BGRX array."""
+        size = self.get_rect_size()
+        if size != self.size:
+            self.__build_context(*size)
+        self.user32.PrintWindow(self.hwnd, self.dc, 0)
+        self.gdi32.GdiFlush()
+        return self.bgrx
+
+    def get_rect_size(self) -> Tuple[int, int]:
+        """Returns the resolution of the whole rect"""
+        rect = win32gui.GetWindowRect(self.hwnd)
+        return rect[2] - rect[0], rect[3] - rect[1]
+
+    def get_rect_size_client(self) -> Tuple[int, int]:
+        """Returns the resolution of the game window"""
+        rect = win32gui.GetClientRect(self.hwnd)
+        return rect[2] - rect[0], rect[3] - rect[1]
+
+    def release(self) -> None:
+        """Free the capture context, the next capture creates a new one."""
+        self.bgrx = None
+        # A bitmap that is still selected into a DC isn't freed
+        if self.dc and self.old_bitmap:
+            self.gdi32.SelectObject(self.dc, self.old_bitmap)
+        if self.dib:
+            self.gdi32.DeleteObject(self.dib)
+        if self.dc:
+            self.gdi32.DeleteDC(self.dc)
+        self.size = self.dc = self.dib = self.old_bitmap = None
+
+
+class ReplayFrameSource(FrameSource):
+    """Replays recorded screenshots instead of capturing the game.
+
+    Recordings are PNG files of the whole window, borders included, as
+    saved by Inputs.save_screenshot(full=True). The client area is assumed
+    to have the usual 8px side borders and the game's 16:10 aspect ratio,
+    unless client_size is given.
+    """
+
+    def __init__(self, path: str, advance: bool = False, client_size: Optional[Tuple[int, int]] = None) -> None:
+        """Load a single PNG, or every PNG in a directory in sorted order.
+
+        Keyword arguments
+        path        -- PNG file or directory of PNG files.
+        advance     -- If True, every capture moves on to the next file,
+                       starting over after the last one. Otherwise use
+                       next_frame() or seek() to move through the files.
+        client_size -- Resolution of the game inside the recorded window.
+        """
+        if os.path.isdir(path):
+            self.files = sorted(glob.glob(os.path.join(path, "*.png")))
+        else:
+            self.files = [path]
+        if not self.files:
+            raise RuntimeError(f"No recorded frames found in {path}.")
+        self.advance = advance
+        self.client_size = client_size
+        self.index = 0
+        self.frames: List[Optional[numpy.ndarray]] = [None] * len(self.files)
+
+    def __load(self, index: int) -> numpy.ndarray:
+        """Load and convert a recording to BGRX once."""
+        if self.frames[index] is None:
+            rgb = numpy.asarray(Image.open(self.files[index]).convert("RGB"))
+            bgrx = numpy.zeros((*rgb.shape[:2], 4), dtype=numpy.uint8)
+            bgrx[:, :, 2::-1] = rgb
+            self.frames[index] = bgrx
+        return self.frames[index]
+
+    def seek(self, index: int) -> None:
+        """Make the recording at index the current frame."""
+        self.index = index % len(self.files)
+
+    def next_frame(self) -> None:
+        """Move on to the next recording."""
+        self.seek(self.index + 1)
+
+    def capture(self) -> numpy.ndarray:
+        """Return the current recording as a BGRX array."""
+        bgrx = self.__load(self.index)
+        if self.advance:
+            self.next_frame()
+        return bgrx
+
+    def get_rect_size(self) -> Tuple[int, int]:
+        """Returns the resolution of the current recording"""
+        height, width, _ = self.__load(self.index).shape
+        return width, height
+
+    def get_rect_size_client(self) -> Tuple[int, int]:
+        """Returns the resolution of the game inside the current recording"""
+        if self.client_size:
+            return self.client_size
+        width, _ = self.get_rect_size()
+        return width - 16, (width - 16) * 600 // 960
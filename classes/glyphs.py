@@ -0,0 +1,189 @@
+"""Glyphs class reads numbers in the game's UI font without tesseract."""
+import glob
+import os
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy
+from PIL import Image
+
+from classes.frame import Frame
+from classes.window import Window
+
+
+class Glyphs:
+    """This class reads single lines of numbers by matching glyphs.
+
+    The area is binarized and cut into glyphs at its connected components,
+    and every glyph is compared with a table of known glyphs. The table is
+    learned from the game with calibrate_glyphs.py and stored as pictures
+    in images/glyphs, one file per sample.
+    """
+
+    # characters that can be learned, and how their files are named
+    names = {**{str(digit): str(digit) for digit in range(10)},
+             "E": "E", "+": "plus", ".": "dot", ",": "comma", ":": "colon"}
+
+    # characters that are part of a number, see read()
+    numeric = set("0123456789,.")
+
+    # glyphs are compared at this width, height
+    size = (10, 16)
+    # the largest difference for a glyph to still be recognized
+    max_distance = 0.2
+    # gaps wider than this share of the line height separate words
+    space = 0.5
+    # how far glyphs like commas reach below the line, as a share of its height
+    descent = 0.3
+    samples = 10
+
+    directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images", "glyphs")
+    # characters, normalized glyphs and aspect ratios, loaded on first use
+    table: Optional[Tuple[List[str], numpy.ndarray, numpy.ndarray]] = None
+
+    @staticmethod
+    def binarize(gray: numpy.ndarray) -> numpy.ndarray:
+        """Return a mask of the text in a grayscale image.
+
+        Text is assumed to cover less of the area than the background, which
+        works for both dark and light text.
+        """
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if numpy.count_nonzero(binary) > binary.size // 2:
+            binary = 255 - binary
+        return binary
+
+    @staticmethod
+    def segment(binary: numpy.ndarray) -> List[Tuple[int, int, numpy.ndarray]]:
+        """Cut a single line of text into glyphs, left to right.
+
+        Components that overlap horizontally, like the dots of a colon, are
+        one glyph. Every glyph is cropped to the same band of the line, from
+        the top of the digits to a bit below their baseline, so its position
+        within the line is kept. Returns x_start, x_end and the crop of each
+        glyph.
+        """
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        boxes = sorted((x, y, x + w, y + h) for x, y, w, h, area in stats[1:count] if area >= 2)
+        if not boxes:
+            return []
+        # Small glyphs like commas don't tell where the line is
+        tallest = max(y2 - y1 for _, y1, _, y2 in boxes)
+        tall = [box for box in boxes if box[3] - box[1] > tallest * 0.6]
+        top = min(box[1] for box in tall)
+        bottom = max(box[3] for box in tall)
+        bottom += round((bottom - top) * Glyphs.descent)
+        binary = numpy.pad(binary, ((0, max(bottom - binary.shape[0], 0)), (0, 0)))
+
+        spans: List[List[int]] = []
+        for x1, _, x2, _ in boxes:
+            if spans and x1 < spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], x2)
+            else:
+                spans.append([x1, x2])
+        return [(x1, x2, binary[top:bottom, x1:x2]) for x1, x2 in spans]
+
+    @staticmethod
+    def normalize(glyph: numpy.ndarray) -> Tuple[numpy.ndarray, float]:
+        """Return the glyph scaled to size with values 0-1, and its aspect ratio."""
+        height, width = glyph.shape
+        scaled = cv2.resize(glyph, Glyphs.size, interpolation=cv2.INTER_AREA).astype(numpy.float32) / 255
+        return scaled, width / height
+
+    @staticmethod
+    def load() -> None:
+        """Load the glyph table from images/glyphs."""
+        chars, glyphs, aspects = [], [], []
+        for char, name in Glyphs.names.items():
+            for path in sorted(glob.glob(os.path.join(Glyphs.directory, f"{name}_*.png"))):
+                glyph = cv2.imread(path, 0)
+                if glyph is not None:
+                    scaled, aspect = Glyphs.normalize(glyph)
+                    chars.append(char)
+                    glyphs.append(scaled)
+                    aspects.append(aspect)
+        Glyphs.table = chars, numpy.array(glyphs), numpy.array(aspects)
+
+    @staticmethod
+    def recognize(glyph: numpy.ndarray) -> Optional[str]:
+        """Return the character glyph shows, or None if it's unknown."""
+        chars, known, known_aspects = Glyphs.table
+        scaled, aspect = Glyphs.normalize(glyph)
+        distances = numpy.abs(known - scaled).mean(axis=(1, 2)) + numpy.abs(known_aspects - aspect) / 2
+        best = int(distances.argmin())
+        return chars[best] if distances[best] < Glyphs.max_distance else None
+
+    @staticmethod
+    def crop(x_start: int, y_start: int, x_end: int, y_end: int, bmp: Image = None) -> numpy.ndarray:
+        """Return the area of the cached frame, or of bmp, as a grayscale array.
+
+        Coordinates are relative to the game, like Inputs.ocr() takes them.
+        """
+        x_start += Window.x
+        x_end += Window.x
+        y_start += Window.y
+        y_end += Window.y
+        # Bitmaps are created with a 8px border
+        if bmp is None:
+            area = Frame.capture_region(x_start + 8, y_start + 8, x_end + 8, y_end + 8)
+        else:
+            area = numpy.asarray(bmp)[y_start + 8:y_end + 8, x_start + 8:x_end + 8]
+        return cv2.cvtColor(numpy.ascontiguousarray(area), cv2.COLOR_RGB2GRAY)
+
+    @staticmethod
+    def read(x_start: int, y_start: int, x_end: int, y_end: int, bmp: Image = None) -> Optional[str]:
+        """Read the text in the area, or return None if no glyphs are learned.
+
+        Unknown glyphs, like letters, are read as spaces. If an unknown glyph
+        is next to a digit the read fails and None is returned as well. The
+        area is cropped from bmp, a bitmap of the window, if it's given.
+        """
+        if Glyphs.table is None:
+            Glyphs.load()
+        if not Glyphs.table[0]:
+            return None
+
+        glyphs = Glyphs.segment(Glyphs.binarize(Glyphs.crop(x_start, y_start, x_end, y_end, bmp)))
+        # Words of recognized characters, None for unknown glyphs
+        words: List[List[Optional[str]]] = []
+        previous_end = None
+        for x1, x2, glyph in glyphs:
+            if previous_end is None or x1 - previous_end > glyph.shape[0] * Glyphs.space:
+                words.append([])
+            words[-1].append(Glyphs.recognize(glyph))
+            previous_end = x2
+
+        for word in words:
+            for i, char in enumerate(word):
+                # An unknown glyph touching a number is probably a digit that
+                # isn't learned, reading it as a space would change the number
+                if char is None and any(c is not None and c in Glyphs.numeric for c in word[max(i - 1, 0):i + 2]):
+                    return None
+        return " ".join("".join(char or " " for char in word) for word in words)
+
+    @staticmethod
+    def learn(x_start: int, y_start: int, x_end: int, y_end: int, text: str) -> int:
+        """Learn the glyphs of the area from the text it shows.
+
+        Spaces in text are ignored, every other character must be one glyph.
+        Characters that can't be learned, like letters, are skipped. Returns
+        how many glyphs were saved.
+        """
+        chars = text.replace(" ", "")
+        glyphs = Glyphs.segment(Glyphs.binarize(Glyphs.crop(x_start, y_start, x_end, y_end)))
+        if len(glyphs) != len(chars):
+            raise ValueError(f"Found {len(glyphs)} glyphs for {len(chars)} characters in {text!r}.")
+
+        os.makedirs(Glyphs.directory, exist_ok=True)
+        saved = 0
+        for char, (_, _, glyph) in zip(chars, glyphs):
+            if char not in Glyphs.names:
+                continue
+            existing = glob.glob(os.path.join(Glyphs.directory, f"{Glyphs.names[char]}_*.png"))
+            if len(existing) >= Glyphs.samples:
+                continue
+            path = os.path.join(Glyphs.directory, f"{Glyphs.names[char]}_{len(existing)}.png")
+            cv2.imwrite(path, glyph)
+            saved += 1
+        Glyphs.table = None
+        return saved
@@ -1,9 +1,12 @@
 """Helper functions."""
 
 import coordinates as coords
+import usersettings as userset
 from classes.com import Com
 from classes.features import Inventory, MoneyPit, Adventure, Yggdrasil, GoldDiggers, Questing
+from classes.frame import Frame
 from classes.inputs import Inputs
+from classes.templates import Templates
 from classes.window import Window
 
 
@@ -11,8 +14,12 @@ class Helper:
     @staticmethod
     def init() -> None:
         Window.init()
-        Com.init()
-        Com.hook()
+        if not Window.replaying():
+            Com.init()
+            Com.hook()
+        if userset.CAPTURE_WORKER:
+            Frame.start_worker()
+        Templates.preload()
 
     @staticmethod
     def requirements() -> None:
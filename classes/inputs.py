@@ -1,37 +1,48 @@
 """Input class contains functions for mouse and keyboard input."""
+import bisect
 import datetime
+import hashlib
 import os
 import re
+import threading
 import time
-from collections import namedtuple
-from ctypes import windll
-from typing import Iterable, Optional, Tuple
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar, Union
 
 import cv2
 import numpy
-import pytesseract
-import win32api
-import win32con as wcon
-import win32gui
-import win32ui
 from PIL import Image
-from PIL import ImageFilter
 
+import coordinates as coords
 import usersettings as userset
 from classes.com import Com
+from classes.frame import Frame
+from classes.glyphs import Glyphs
+from classes.ocrengine import OCREngine, PytesseractEngine, TesserocrEngine, tesserocr
+from classes.templates import Templates
 from classes.window import Window
 
+try:
+    import win32api
+    import win32con as wcon
+    import win32gui
+except ImportError:  # Replaying recorded frames works without pywin32, sending inputs doesn't
+    win32api = wcon = win32gui = None
+
+T = TypeVar("T")
 
 class Inputs:
     """This class handles inputs."""
 
     Btn = namedtuple("Btn", ["btn", "down", "up"])
+    Probes = namedtuple("Probes", ["keys", "xs", "ys", "targets"])
 
     btns = {
         "left": Btn(wcon.MK_LBUTTON, wcon.WM_LBUTTONDOWN, wcon.WM_LBUTTONUP),  # left mouse button
         "right": Btn(wcon.MK_RBUTTON, wcon.WM_RBUTTONDOWN, wcon.WM_RBUTTONUP),  # right mouse button
         "middle": Btn(wcon.MK_MBUTTON, wcon.WM_MBUTTONDOWN, wcon.WM_MBUTTONUP)  # middle mouse button
-    }
+    } if wcon else {}
 
     specialKeys = {
         "leftShift": 0,  # left shift
@@ -47,19 +58,57 @@ class Inputs:
         "down": 274  # down arrow
     }
 
+    # matches images in the background, see get_pool()
+    pool = None
+
+    # pyramid mode of image_search(), pictures that are smaller than
+    # PYRAMID_MIN_SIZE once downscaled are searched at full resolution
+    # instead, the coarse search can't tell them apart from their surroundings
+    PYRAMID_MIN_SIZE = 8
+    PYRAMID_CANDIDATES = 10
+
+    # reads the text for ocr(), see get_ocr_engine()
+    ocr_engine: OCREngine = None
+    # reads text in the background, see ocr_async()
+    ocr_pool = None
+
+    # results of ocr() by image and config, see ocr_stats()
+    ocr_cache = OrderedDict()
+    OCR_CACHE_SIZE = 256
+    ocr_hits = 0
+    ocr_misses = 0
+    ocr_lock = threading.Lock()
+    # text detection of the crop step of prepare_ocr()
+    OCR_CROP_CONTRAST = 48
+    OCR_CROP_MARGIN = 4
+    SHARPEN_KERNEL = numpy.array([[-2, -2, -2], [-2, 32, -2], [-2, -2, -2]], dtype=numpy.float32) / 16
+    # height of the background band between the areas of ocr_batch()
+    OCR_BATCH_SPACING = 40
+
+    # time spent in wait_for(), see wait_stats()
+    waits = 0
+    timeouts = 0
+    waited = 0.0
+
     @staticmethod
     def cursor_position(x: int, y: int) -> None:
         """Set cursor position to (x, y)"""
+        if Window.replaying():
+            return
         Com.set_cur_pos(x + Window.cx, y + Window.cy)
 
     @staticmethod
     def restore_cursor() -> None:
         """Restore cursor position"""
+        if Window.replaying():
+            return
         Com.restore_cur()
 
     @staticmethod
     def special(special: str = "leftShift") -> None:
         """Simulate special button to be down"""
+        if Window.replaying():
+            return
         # UnityEngine.Input.GetKeyString
         key = Inputs.specialKeys[special]
         Com.special(key)
@@ -67,11 +116,15 @@ class Inputs:
     @staticmethod
     def restore_special() -> None:
         """Restore special button state"""
+        if Window.replaying():
+            return
         Com.restore_special()
 
     @staticmethod
     def click(x: int, y: int, button: str = "left") -> None:
         """Click at pixel xy."""
+        if Window.replaying():
+            return
         # No need for checking if special keys are pressed down.
         # When game is out of focus they are not sent :)
         button = Inputs.btns[button]
@@ -84,6 +137,8 @@ class Inputs:
     @staticmethod
     def click_drag(x: int, y: int, x2: int, y2: int, button: str = "left") -> None:
         """Simulate drag event from x, y to x2, y2"""
+        if Window.replaying():
+            return
         button = Inputs.btns[button]
         Com.set_cur_pos(x + Window.cx, y + Window.cy)
         win32gui.SendMessage(Window.id, button.down, button.btn, 0)
@@ -109,6 +164,8 @@ class Inputs:
     @staticmethod
     def send_string(s):
         """Send string to game"""
+        if Window.replaying():
+            return
         for c in str(s):
             # UnityEngine.UI.InputField
             vkc = win32api.VkKeyScan(c)
@@ -124,68 +181,81 @@ class Inputs:
     @staticmethod
     def send_arrow_press(a: str = "left") -> None:
         """Sends either a left, right, up or down arrow key press"""
+        if Window.replaying():
+            return
         key = Inputs.arrow[a]
         Com.shortcut(key)
         time.sleep(userset.SHORT_SLEEP)
 
     @staticmethod
     def get_bitmap() -> Image:
-        """Get and return a bitmap of the Window."""
-        left, top, right, bot = win32gui.GetWindowRect(Window.id)
-        w = right - left
-        h = bot - top
-        hwnd_dc = win32gui.GetWindowDC(Window.id)
-        mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
-        save_dc = mfc_dc.CreateCompatibleDC()
-        save_bitmap = win32ui.CreateBitmap()
-        save_bitmap.CreateCompatibleBitmap(mfc_dc, w, h)
-        save_dc.SelectObject(save_bitmap)
-        windll.user32.PrintWindow(Window.id, save_dc.GetSafeHdc(), 0)
-        bmpinfo = save_bitmap.GetInfo()
-        bmpstr = save_bitmap.GetBitmapBits(True)
-
-        # This creates an Image object from Pillow
-        bmp = Image.frombuffer('RGB',
-                               (bmpinfo['bmWidth'],
-                                bmpinfo['bmHeight']),
-                               bmpstr, 'raw', 'BGRX', 0, 1)
-
-        win32gui.DeleteObject(save_bitmap.GetHandle())
-        save_dc.DeleteDC()
-        mfc_dc.DeleteDC()
-        win32gui.ReleaseDC(Window.id, hwnd_dc)
-        # bmp.save("asdf.png")
-        return bmp
+        """Get and return a bitmap of the Window.
+
+        The bitmap is built from the cached frame, see classes.frame.Frame.
+        """
+        return Image.fromarray(Frame.get())
 
     @staticmethod
     def get_cropped_bitmap(x_start: int = 0, y_start: int = 0, x_end: int = 960, y_end: int = 600) -> Image:
-        return Inputs.get_bitmap().crop(
-            (x_start + 8, y_start + 8, x_end + 8, y_end + 8))
+        """Get and return a bitmap of the supplied area of the Window."""
+        # Bitmaps are created with a 8px border
+        return Image.fromarray(Frame.capture_region(x_start + 8, y_start + 8, x_end + 8, y_end + 8))
 
     @staticmethod
-    def pixel_search(color: str, x_start: int, y_start: int, x_end: int, y_end: int) -> Optional[Tuple[int, int]]:
+    def __pixel_mask(color: str, x_start: int, y_start: int, x_end: int, y_end: int,
+                     tolerance: int) -> Tuple[numpy.ndarray, int, int]:
+        """Return a boolean mask of the pixels in area matching color, and its offset."""
+        frame = Frame.get()
+        height, width, _ = frame.shape
+        x_start, y_start = max(x_start, 0), max(y_start, 0)
+        area = frame[y_start:min(y_end, height), x_start:min(x_end, width)]
+
+        if tolerance:
+            rgb = numpy.array(Inputs.hex_to_rgb(color), dtype=numpy.int16)
+            mask = (numpy.abs(area.astype(numpy.int16) - rgb) <= tolerance).all(axis=2)
+        else:
+            area = area.astype(numpy.int32)
+            mask = (area[..., 0] << 16 | area[..., 1] << 8 | area[..., 2]) == int(color, 16)
+
+        return mask, x_start, y_start
+
+    @staticmethod
+    def pixel_search(color: str, x_start: int, y_start: int, x_end: int, y_end: int,
+                     tolerance: int = 0) -> Optional[Tuple[int, int]]:
         """Find the first pixel with the supplied color within area.
         
         Function searches per row, left to right. Returns the coordinates of
         first match or None, if nothing is found.
         
         Color must be supplied in hex.
+
+        Keyword arguments
+        tolerance -- The largest difference per channel that still counts as
+                     a match. Zero means the color must match exactly.
         """
-        bmp = Inputs.get_bitmap()
-        width, height = bmp.size
-        for y in range(y_start, y_end):
-            for x in range(x_start, x_end):
-                if y > height or x > width:
-                    continue
-                t = bmp.getpixel((x, y))
-                if Inputs.rgb_to_hex(t) == color:
-                    return x - 8, y - 8
+        mask, x_offset, y_offset = Inputs.__pixel_mask(color, x_start, y_start, x_end, y_end, tolerance)
+        if not mask.any():
+            return None
 
-        return None
+        y, x = numpy.unravel_index(numpy.argmax(mask), mask.shape)
+        # Bitmaps are created with a 8px border
+        return int(x) + x_offset - 8, int(y) + y_offset - 8
+
+    @staticmethod
+    def pixel_search_all(color: str, x_start: int, y_start: int, x_end: int, y_end: int,
+                         tolerance: int = 0) -> List[Tuple[int, int]]:
+        """Find all pixels with the supplied color within area.
+
+        Returns a list with the coordinates of every match, ordered per row,
+        left to right. Takes the same arguments as pixel_search().
+        """
+        mask, x_offset, y_offset = Inputs.__pixel_mask(color, x_start, y_start, x_end, y_end, tolerance)
+        ys, xs = numpy.nonzero(mask)
+        return list(zip((xs + x_offset - 8).tolist(), (ys + y_offset - 8).tolist()))
 
     @staticmethod
     def image_search(x_start: int, y_start: int, x_end: int, y_end: int,
-                     img: str, threshold: int, bmp: Image = None) -> Optional[Tuple[int, int]]:
+                     img: str, threshold: int, bmp: Image = None, pyramid: int = 1) -> Optional[Tuple[int, int]]:
         """Search the screen for the supplied picture.
         
         Returns a tuple with x,y-coordinates, or None if result is below
@@ -202,21 +272,74 @@ class Inputs:
                      from the same page. This is to avoid to needlessly get the
                      same bitmap multiple times. If a bitmap is not passed, the
                      function will get the bitmap itself. (default None)
+        pyramid   -- Downscale factor for a coarse search, 2 or 4. Only the
+                     best coarse candidates are then searched at full
+                     resolution. 1 searches the whole area at full resolution.
+                     Pictures too small to downscale are searched at full
+                     resolution anyway, see benchmarks.pyramid before using it.
         """
-        if not bmp: bmp = Inputs.get_bitmap()
+        if pyramid not in (1, 2, 4):
+            raise ValueError(f"pyramid must be 1, 2 or 4, got {pyramid}")
         # Bitmaps are created with a 8px border
-        search_area = bmp.crop((x_start + 8, y_start + 8,
-                                x_end + 8, y_end + 8))
-        search_area = numpy.asarray(search_area)
+        if bmp:
+            search_area = numpy.asarray(bmp.crop((x_start + 8, y_start + 8, x_end + 8, y_end + 8)))
+        else:
+            search_area = Frame.capture_region(x_start + 8, y_start + 8, x_end + 8, y_end + 8)
         search_area = cv2.cvtColor(search_area, cv2.COLOR_RGB2GRAY)
-        template = cv2.imread(img, 0)
-        res = cv2.matchTemplate(search_area, template, cv2.TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        template = Templates.get(img)
+        if pyramid > 1 and min(template.shape) // pyramid >= Inputs.PYRAMID_MIN_SIZE:
+            max_val, max_loc = Inputs.__pyramid_search(search_area, img, pyramid)
+        else:
+            res = cv2.matchTemplate(search_area, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(res)
         if max_val < threshold:
             return None
 
         return max_loc
 
+    @staticmethod
+    def __pyramid_search(search_area: numpy.ndarray, img: str, factor: int) -> Tuple[float, Tuple[int, int]]:
+        """Match img against a downscaled search_area, then refine the best
+        candidates at full resolution.
+
+        Both are downscaled with a Gaussian pyramid, which keeps thin lines
+        in the pictures matchable. Returns the best score and its location
+        like cv2.minMaxLoc() does.
+        """
+        template = Templates.get(img)
+        h, w = template.shape
+        area_h, area_w = search_area.shape
+        level = factor.bit_length() - 1
+        small_template = Templates.get_level(img, level)
+        small_area = search_area
+        for _ in range(level):
+            small_area = cv2.pyrDown(small_area)
+        if small_area.shape[0] < small_template.shape[0] or small_area.shape[1] < small_template.shape[1]:
+            res = cv2.matchTemplate(search_area, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(res)
+            return max_val, max_loc
+
+        res = cv2.matchTemplate(small_area, small_template, cv2.TM_CCOEFF_NORMED)
+        th, tw = small_template.shape
+        best_val, best_loc = -1.0, (0, 0)
+        for _ in range(Inputs.PYRAMID_CANDIDATES):
+            _, coarse_val, _, (cx, cy) = cv2.minMaxLoc(res)
+            if coarse_val <= -1:
+                break
+            # Suppress the candidate so the next one is somewhere else
+            res[max(cy - th // 2, 0):cy + th // 2 + 1, max(cx - tw // 2, 0):cx + tw // 2 + 1] = -1
+
+            # Search a window of a coarse pixel around it at full resolution
+            x1, y1 = max(cx * factor - factor, 0), max(cy * factor - factor, 0)
+            x2, y2 = min(cx * factor + w + factor, area_w), min(cy * factor + h + factor, area_h)
+            if x2 - x1 < w or y2 - y1 < h:
+                continue
+            fine = cv2.matchTemplate(search_area[y1:y2, x1:x2], template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, (fx, fy) = cv2.minMaxLoc(fine)
+            if max_val > best_val:
+                best_val, best_loc = max_val, (x1 + fx, y1 + fy)
+        return best_val, best_loc
+
     @staticmethod
     def find_all(
             x_start: int,
@@ -225,39 +348,136 @@ class Inputs:
             y_end: int,
             img: str,
             threshold: float,
-            bmp: Image = None) -> tuple:
+            bmp: Image = None,
+            min_distance: int = None,
+            slots: bool = False) -> tuple:
         """Search the screen for the supplied picture.
         
         Returns a list with x, y-coordinates with all matches, or None if result is below
         the threshold.
         
         Keyword arguments:
-        image     -- Filename or path to file that you search for.
-        threshold -- The level of fuzziness to use - a perfect match will be
-                     close to 1, but probably never 1. In my testing use a
-                     value between 0.7-0.95 depending on how strict you wish
-                     to be.
-        bmp       -- a bitmap from the get_bitmap() function, use this if you're
-                     performing multiple different OCR-readings in succession
-                     from the same page. This is to avoid to needlessly get the
-                     same bitmap multiple times. If a bitmap is not passed, the
-                     function will get the bitmap itself. (default None)
+        image        -- Filename or path to file that you search for.
+        threshold    -- The level of fuzziness to use - a perfect match will be
+                        close to 1, but probably never 1. In my testing use a
+                        value between 0.7-0.95 depending on how strict you wish
+                        to be.
+        bmp          -- a bitmap from the get_bitmap() function, use this if you're
+                        performing multiple different OCR-readings in succession
+                        from the same page. This is to avoid to needlessly get the
+                        same bitmap multiple times. If a bitmap is not passed, the
+                        function will get the bitmap itself. (default None)
+        min_distance -- Matches closer than this to a better match are dropped,
+                        so every picture on screen is only found once. Must be
+                        at least 1. Defaults to the size of the picture.
+        slots        -- If True, move the matches to the center of the
+                        inventory slot they are in, dropping duplicates.
         """
-        if not bmp: bmp = Inputs.get_bitmap()
+        if min_distance is not None and min_distance < 1:
+            raise ValueError(f"min_distance must be at least 1, got {min_distance}")
         # Bitmaps are created with a 8px border
-        search_area = bmp.crop((x_start + 8, y_start + 8,
-                                x_end + 8, y_end + 8))
-        search_area = numpy.asarray(search_area)
+        if bmp:
+            search_area = numpy.asarray(bmp.crop((x_start + 8, y_start + 8, x_end + 8, y_end + 8)))
+        else:
+            search_area = Frame.capture_region(x_start + 8, y_start + 8, x_end + 8, y_end + 8)
         search_area = cv2.cvtColor(search_area, cv2.COLOR_RGB2GRAY)
-        template = cv2.imread(img, 0)
+        template = Templates.get(img)
         w, h = template.shape[::-1]
         res = cv2.matchTemplate(search_area, template, cv2.TM_CCOEFF_NORMED)
-        locs = numpy.where(res >= threshold)
-        lst = []
-        for loc in zip(*locs[::-1]):
-            lst.append((loc[0] + w // 2, loc[1] + h // 2))
+        distance = (w, h) if min_distance is None else (min_distance, min_distance)
+        xs, ys = Inputs.__suppress(res, threshold, *distance)
+        lst = list(zip((xs + w // 2).tolist(), (ys + h // 2).tolist()))
+        if slots:
+            lst = Inputs.__snap_to_slots(lst, x_start, y_start)
         return lst
 
+    @staticmethod
+    def __suppress(res: numpy.ndarray, threshold: float, min_x: int, min_y: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the locations of the best matches in a matchTemplate result.
+
+        Only matches that are the best within min_x, min_y pixels are kept,
+        best match first.
+        """
+        # A match is a peak if nothing within the distance scores higher
+        kernel = numpy.ones((2 * min_y - 1, 2 * min_x - 1), numpy.uint8)
+        peaks = (res >= threshold) & (res >= cv2.dilate(res, kernel))
+        ys, xs = numpy.nonzero(peaks)
+        order = numpy.argsort(-res[ys, xs], kind="stable")
+        xs, ys = xs[order], ys[order]
+
+        # Neighbours with exactly the same score are all peaks, keep the first
+        keep = numpy.ones(len(xs), dtype=bool)
+        for i in range(1, len(xs)):
+            close = (numpy.abs(xs[:i] - xs[i]) < min_x) & (numpy.abs(ys[:i] - ys[i]) < min_y) & keep[:i]
+            keep[i] = not close.any()
+        return xs[keep], ys[keep]
+
+    @staticmethod
+    def __snap_to_slots(locs: List[Tuple[int, int]], x_start: int, y_start: int) -> List[Tuple[int, int]]:
+        """Move locations relative to x_start, y_start to the nearest
+        inventory slot center, dropping duplicates."""
+        # The slots are relative to the game, the search area to the window
+        x_slot, y_slot = coords.INVENTORY_SLOTS
+        x_slot += Window.x
+        y_slot += Window.y
+        snapped = []
+        for x, y in locs:
+            x = x_slot + round((x + x_start - x_slot) / 50) * 50 - x_start
+            y = y_slot + round((y + y_start - y_slot) / 50) * 50 - y_start
+            if (x, y) not in snapped:
+                snapped.append((x, y))
+        return snapped
+
+    @staticmethod
+    def match_templates(templates: Iterable[str], area: Tuple[int, int, int, int], threshold: float,
+                        bmp: Image = None) -> Dict[str, List[Tuple[int, int]]]:
+        """Search an area for several pictures at once.
+
+        The area is cropped and converted to grayscale once and the pictures
+        are matched against it in a thread pool. Returns a dict with a list of
+        the centers of all matches for every picture, best match first, with
+        overlapping matches dropped like find_all() does.
+        Coordinates are relative to the game, like area.
+
+        Keyword arguments
+        templates -- Filenames or paths of the pictures to search for.
+        area      -- x_start, y_start, x_end, y_end of the area to search,
+                     e.g. an OCRBox.
+        threshold -- The level of fuzziness to use, see image_search().
+        bmp       -- a bitmap from the get_bitmap() function, if not passed the
+                     cached frame is used.
+        """
+        x_start, y_start, x_end, y_end = area
+        left, top = x_start + Window.x, y_start + Window.y
+        right, bottom = x_end + Window.x, y_end + Window.y
+        # Bitmaps are created with a 8px border
+        if bmp:
+            search_area = numpy.asarray(bmp.crop((left + 8, top + 8, right + 8, bottom + 8)))
+        else:
+            search_area = Frame.capture_region(left + 8, top + 8, right + 8, bottom + 8)
+        search_area = cv2.cvtColor(search_area, cv2.COLOR_RGB2GRAY)
+
+        def match(path: str) -> List[Tuple[int, int]]:
+            template = Templates.get(path)
+            h, w = template.shape
+            res = cv2.matchTemplate(search_area, template, cv2.TM_CCOEFF_NORMED)
+            xs, ys = Inputs.__suppress(res, threshold, w, h)
+            return [(int(x) + x_start + w // 2, int(y) + y_start + h // 2) for x, y in zip(xs, ys)]
+
+        templates = list(templates)
+        return dict(zip(templates, Inputs.get_pool().map(match, templates)))
+
+    @staticmethod
+    def get_pool() -> ThreadPoolExecutor:
+        """Return the thread pool used for image matching.
+
+        OpenCV releases the GIL while matching, so the threads run in
+        parallel with each other and with inputs sent meanwhile.
+        """
+        if Inputs.pool is None:
+            Inputs.pool = ThreadPoolExecutor(thread_name_prefix="match")
+        return Inputs.pool
+
     @staticmethod
     def rgb_equal(a: Tuple[int, int, int], b: Tuple[int, int, int]) -> bool:
         if a[0] != b[0]: return False
@@ -265,6 +485,51 @@ class Inputs:
         if a[2] != b[2]: return False
         return True
 
+    @staticmethod
+    def prepare_ocr(bmp: Image, profile: coords.OCRProfile, debug: bool = False) -> Image:
+        """Filter a cropped bitmap for OCR as described by profile, see
+        coordinates.OCRProfile. Returns a grayscale image."""
+        if bmp.mode not in ('RGB', 'L'):
+            bmp = bmp.convert('RGB')
+        gray = numpy.asarray(bmp)
+        if gray.ndim == 3:
+            gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
+
+        if profile.threshold > 0:  # Binarizing Filter
+            lut = numpy.where(numpy.arange(256) > profile.threshold, 255, 0).astype(numpy.uint8)
+            gray = cv2.LUT(gray, lut)
+            if debug: Image.fromarray(gray).save("debug_ocr_whiten.png")
+
+        if profile.crop:  # Cut the area down to the text and a margin
+            if profile.threshold > 0:
+                mask = gray
+            else:
+                border = numpy.concatenate((gray[0], gray[-1], gray[:, 0], gray[:, -1]))
+                mask = cv2.absdiff(gray, int(numpy.median(border)))
+                mask = (mask > Inputs.OCR_CROP_CONTRAST).astype(numpy.uint8)
+            x, y, w, h = cv2.boundingRect(mask)
+            if w and h:
+                margin = Inputs.OCR_CROP_MARGIN
+                gray = gray[max(y - margin, 0):y + h + margin, max(x - margin, 0):x + w + margin]
+
+        if profile.scale != 1:  # Resizing
+            gray = cv2.resize(gray, None, fx=profile.scale, fy=profile.scale, interpolation=cv2.INTER_CUBIC)
+
+        if profile.sharpen:  # Same kernel as PIL's ImageFilter.SHARPEN
+            gray = cv2.filter2D(gray, -1, Inputs.SHARPEN_KERNEL)
+
+        bmp = Image.fromarray(gray)
+        if debug and (profile.crop or profile.scale != 1 or profile.sharpen): bmp.save("debug_ocr_filter.png")
+        return bmp
+
+    @staticmethod
+    def __profile(profile: Optional[coords.OCRProfile], ocr_filter: bool, binf: int) -> coords.OCRProfile:
+        """Return profile, or the one ocr_filter and binf describe if it's None."""
+        if profile is not None:
+            return profile
+        base = coords.OCR_PROFILE_DEFAULT if ocr_filter else coords.OCR_PROFILE_RAW
+        return base._replace(threshold=binf)
+
     @staticmethod
     def ocr(
             x_start: int,
@@ -276,7 +541,8 @@ class Inputs:
             cropb: bool = False,
             ocr_filter: bool = True,
             binf: int = 0,
-            sliced: bool = False
+            sliced: bool = False,
+            profile: coords.OCRProfile = None
     ) -> str:
         """Perform an OCR of the supplied area, returns a string of the result.
         
@@ -292,6 +558,11 @@ class Inputs:
         binf   -- Threshold value for binarizing filter. Zero means no filtering.
         sliced -- Whether the image has ben sliced so there's very little blank
                   space. Gets better readings from small values for some reason.
+        profile -- How to filter the image, one of the OCR_PROFILE_ settings in
+                   coordinates.py. Replaces filter and binf. (default None)
+
+        Results are cached by the pixels of the area and the filter settings,
+        reading an unchanged area again doesn't run tesseract.
         """
         x_start += Window.x
         x_end += Window.x
@@ -305,40 +576,186 @@ class Inputs:
             # Bitmaps are created with a 8px border
             bmp = bmp.crop((x_start + 8, y_start + 8, x_end + 8, y_end + 8))
 
-        if binf > 0:  # Binarizing Filter
-            fn = lambda x: 255 if x > binf else 0
-            bmp = bmp.convert('L')  # To Monochrome
-            bmp = bmp.point(fn, mode='1')
-            if debug: bmp.save("debug_ocr_whiten.png")
+        # The filters below only depend on these, so they don't need to run to
+        # build the key
+        profile = Inputs.__profile(profile, ocr_filter, binf)
+        key = (hashlib.blake2b(bmp.tobytes(), digest_size=16).digest(), bmp.mode, bmp.size,
+               profile, sliced)
+        if not debug:
+            s = Inputs.__cached(key)
+            if s is not None:
+                return s
+
+        bmp = Inputs.prepare_ocr(bmp, profile, debug)
+        s = Inputs.get_ocr_engine().image_to_string(bmp, config='--psm 6' if sliced else '--psm 4')
+        Inputs.__cache(key, s)
+        return s
 
-        if ocr_filter:  # Resizing and sharpening
-            *_, right, lower = bmp.getbbox()
-            bmp = bmp.resize((right * 4, lower * 4), Image.BICUBIC)  # Resize image
-            bmp = bmp.filter(ImageFilter.SHARPEN)
-            if debug: bmp.save("debug_ocr_filter.png")
+    @staticmethod
+    def __cached(key: Hashable) -> Optional[str]:
+        """Return the cached OCR result for key, or None if there isn't one."""
+        with Inputs.ocr_lock:
+            s = Inputs.ocr_cache.get(key)
+            if s is not None:
+                Inputs.ocr_cache.move_to_end(key)
+                Inputs.ocr_hits += 1
+            return s
 
-        if sliced:
-            s = pytesseract.image_to_string(bmp, config='--psm 6')
-        else:
-            s = pytesseract.image_to_string(bmp, config='--psm 4')
+    @staticmethod
+    def __cache(key: Hashable, s: str) -> None:
+        """Store an OCR result, dropping the oldest one if the cache is full."""
+        with Inputs.ocr_lock:
+            Inputs.ocr_misses += 1
+            Inputs.ocr_cache[key] = s
+            if len(Inputs.ocr_cache) > Inputs.OCR_CACHE_SIZE:
+                Inputs.ocr_cache.popitem(last=False)
 
-        return s
+    @staticmethod
+    def ocr_batch(
+            regions: Iterable[Tuple[int, int, int, int]],
+            bmps: Iterable[Optional[Image.Image]] = None,
+            cropb: bool = True,
+            ocr_filter: bool = True,
+            binf: int = 0,
+            sliced: bool = False,
+            profile: coords.OCRProfile = None
+    ) -> List[str]:
+        """Perform an OCR of several areas in one pass, returns a string per area.
+
+        The filtered crops are stacked into one image, read at once and the
+        words are given back to the crop they were found in, so tesseract is
+        only started once. Use this when several areas are read in succession,
+        the results are cached like with ocr().
+
+        Keyword arguments
+        regions -- The areas to read, as x_start, y_start, x_end, y_end.
+        bmps    -- A bitmap from get_bitmap() for every area, or None to use
+                   the current frame for an area. (default None)
+        cropb   -- Whether the bitmaps should be cropped to the areas, if not
+                   the bitmaps are read whole like ocr() does. (default True)
+        The other arguments are the same as ocr()'s.
+        """
+        regions = list(regions)
+        bmps = list(bmps) if bmps is not None else [None] * len(regions)
+        profile = Inputs.__profile(profile, ocr_filter, binf)
+        results: List[Optional[str]] = [None] * len(regions)
+        keys, crops, todo = [], [], []
+        for i, ((x_start, y_start, x_end, y_end), bmp) in enumerate(zip(regions, bmps)):
+            x_start += Window.x
+            x_end += Window.x
+            y_start += Window.y
+            y_end += Window.y
+            if bmp is None:
+                bmp = Inputs.get_cropped_bitmap(x_start, y_start, x_end, y_end)
+            elif cropb:
+                # Bitmaps are created with a 8px border
+                bmp = bmp.crop((x_start + 8, y_start + 8, x_end + 8, y_end + 8))
+
+            # Lines are rebuilt from words, so the text isn't the same as ocr()'s
+            key = (hashlib.blake2b(bmp.tobytes(), digest_size=16).digest(), bmp.mode, bmp.size,
+                   profile, sliced, "batch")
+            keys.append(key)
+            results[i] = Inputs.__cached(key)
+            if results[i] is None:
+                crops.append(Inputs.prepare_ocr(bmp, profile))
+                todo.append(i)
+
+        if crops:
+            # Every crop is followed by a band of its background, so lines of
+            # different crops are never read as one
+            width = max(crop.width for crop in crops)
+            tops = []
+            height = 0
+            for crop in crops:
+                tops.append(height)
+                height += crop.height + Inputs.OCR_BATCH_SPACING
+            stitched = Image.new('L', (width, height))
+            for crop, top in zip(crops, tops):
+                stitched.paste(crop.getpixel((0, 0)), (0, top, width, top + crop.height + Inputs.OCR_BATCH_SPACING))
+                stitched.paste(crop, (0, top))
+
+            words = Inputs.get_ocr_engine().image_to_words(stitched, config='--psm 6' if sliced else '--psm 4')
+            lines: List[List[Tuple[Hashable, List[str]]]] = [[] for _ in crops]
+            for text, top, bottom, line in words:
+                # the last crop starting above the middle of the word
+                index = max(bisect.bisect_right(tops, (top + bottom) // 2) - 1, 0)
+                if lines[index] and lines[index][-1][0] == line:
+                    lines[index][-1][1].append(text)
+                else:
+                    lines[index].append((line, [text]))
+
+            for index, i in enumerate(todo):
+                results[i] = "\n".join(" ".join(line) for _, line in lines[index])
+                Inputs.__cache(keys[i], results[i])
+
+        return results
+
+    @staticmethod
+    def get_ocr_engine() -> OCREngine:
+        """Return the engine ocr() reads text with, choosing it on first use.
+
+        usersettings.OCR_ENGINE picks "tesserocr", which keeps tesseract
+        loaded in this process, or "pytesseract", which starts tesseract for
+        every read. "auto" uses tesserocr if it's installed.
+        """
+        if Inputs.ocr_engine is None:
+            if userset.OCR_ENGINE == "tesserocr" or (userset.OCR_ENGINE == "auto" and tesserocr):
+                Inputs.ocr_engine = TesserocrEngine()
+            else:
+                Inputs.ocr_engine = PytesseractEngine()
+        return Inputs.ocr_engine
+
+    @staticmethod
+    def get_ocr_pool() -> ThreadPoolExecutor:
+        """Return the thread ocr_async() reads text in.
+
+        There's a single thread, the engines read one image at a time anyway
+        and the reads finish in the order they were started.
+        """
+        if Inputs.ocr_pool is None:
+            Inputs.ocr_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr")
+        return Inputs.ocr_pool
+
+    @staticmethod
+    def ocr_async(x_1: int, y_1: int, x_2: int, y_2: int, reader: Callable[..., T] = None) -> Future:
+        """Start reading the area in the background and return a future of the result.
+
+        The window is captured right away, so the game can be used while the
+        text is read.
+
+        Keyword arguments
+        reader -- The function that reads the area, called with the area and
+                  the captured bitmap as bmp, like ocr_number(). (default ocr())
+        """
+        reader = reader or Inputs.ocr
+        bmp = Inputs.get_bitmap()
+        if reader is Inputs.ocr:
+            return Inputs.get_ocr_pool().submit(reader, x_1, y_1, x_2, y_2, bmp=bmp, cropb=True)
+        return Inputs.get_ocr_pool().submit(reader, x_1, y_1, x_2, y_2, bmp=bmp)
+
+    @staticmethod
+    def ocr_stats() -> Dict[str, int]:
+        """Return the ocr() cache counters."""
+        return {"hits": Inputs.ocr_hits, "misses": Inputs.ocr_misses, "cached": len(Inputs.ocr_cache)}
+
+    @staticmethod
+    def clear_ocr_cache() -> None:
+        """Forget all cached ocr() results and reset the counters."""
+        with Inputs.ocr_lock:
+            Inputs.ocr_cache.clear()
+            Inputs.ocr_hits = 0
+            Inputs.ocr_misses = 0
 
     @staticmethod
     def get_pixel_color(x: int, y: int, debug: bool = False) -> str:
         """Get the color of selected pixel in HEX."""
-        dc = win32gui.GetWindowDC(Window.id)
         x, y = Window.coord_manager(x, y)
-        rgba = win32gui.GetPixel(dc, x, y)
-        win32gui.ReleaseDC(Window.id, dc)
-        r = rgba & 0xff
-        g = rgba >> 8 & 0xff
-        b = rgba >> 16 & 0xff
+        rgb = Frame.get_pixel(x, y)
 
         if debug:
-            print(Inputs.rgb_to_hex((r, g, b)))
+            print(Inputs.rgb_to_hex(rgb))
 
-        return Inputs.rgb_to_hex((r, g, b))
+        return Inputs.rgb_to_hex(rgb)
 
     @staticmethod
     def check_pixel_color(x: int, y: int, checks: Iterable[str], debug: bool = False) -> bool:
@@ -353,6 +770,162 @@ class Inputs:
 
         return checks in color
 
+    @staticmethod
+    def wait_for(check: tuple, present: bool = True, timeout: float = 5, poll: float = 0.01,
+                 max_poll: float = 0.25) -> Optional[float]:
+        """Wait until a ColorPixel check passes, or stops passing.
+
+        The check is done right away on the cached frame, after that on a new
+        capture every poll seconds, doubling the delay up to max_poll seconds
+        for long waits. Returns the time waited in seconds, or None if the
+        timeout was reached.
+
+        Keyword arguments
+        check    -- The ColorPixel to wait for.
+        present  -- If False, wait until the check no longer passes.
+        timeout  -- The longest time to wait in seconds.
+        poll     -- The delay before the first new capture.
+        max_poll -- The longest delay between captures.
+        """
+        start = time.perf_counter()
+        deadline = start + timeout
+        delay = poll
+        while Inputs.check_pixel_color(*check) != present:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                Inputs.waits += 1
+                Inputs.timeouts += 1
+                Inputs.waited += time.perf_counter() - start
+                return None
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_poll)
+            Frame.invalidate()
+
+        elapsed = time.perf_counter() - start
+        Inputs.waits += 1
+        Inputs.waited += elapsed
+        return elapsed
+
+    @staticmethod
+    def wait_stats() -> Dict[str, Union[int, float]]:
+        """Return how often and how long wait_for() has waited."""
+        return {"waits": Inputs.waits, "timeouts": Inputs.timeouts, "waited": Inputs.waited}
+
+    @staticmethod
+    def reset_wait_stats() -> None:
+        """Reset the wait_for() counters."""
+        Inputs.waits = 0
+        Inputs.timeouts = 0
+        Inputs.waited = 0.0
+
+    @staticmethod
+    def compile_probes(probes: Union[Dict[Hashable, tuple], Iterable[tuple]]) -> "Inputs.Probes":
+        """Compile ColorPixel checks for probe_many().
+
+        Every check is turned into the three window coordinates that
+        check_pixel_color() looks at and the packed integers of its colors.
+        Compile once and reuse the result in loops, but compile again if the
+        window is resized.
+
+        Keyword arguments
+        probes -- A dict of ColorPixels, or any iterable of them in which case
+                  the results are keyed by position.
+        """
+        if isinstance(probes, dict):
+            keys = list(probes.keys())
+            probes = list(probes.values())
+        else:
+            probes = list(probes)
+            keys = list(range(len(probes)))
+
+        colors = [[p.color] if isinstance(p.color, str) else list(p.color) for p in probes]
+        targets = numpy.full((len(probes), max(map(len, colors), default=1)), -1, dtype=numpy.int32)
+        for i, color in enumerate(colors):
+            targets[i, :len(color)] = [int(c, 16) for c in color]
+
+        offsets = numpy.array([0, -1, 1])
+        xs = numpy.array([p.x for p in probes], dtype=numpy.intp).reshape(-1, 1) + offsets
+        ys = numpy.array([p.y for p in probes], dtype=numpy.intp).reshape(-1, 1) + offsets
+        xs, ys = Window.coord_manager_many(xs, ys)
+
+        return Inputs.Probes(keys, xs, ys, targets)
+
+    @staticmethod
+    def probe_many(probes: Union["Inputs.Probes", Dict[Hashable, tuple], Iterable[tuple]]) -> Dict[Hashable, bool]:
+        """Check several ColorPixels against a single capture.
+
+        Returns a dict with the result of check_pixel_color() for each check,
+        keyed like the dict that was passed, or by position.
+
+        Keyword arguments
+        probes -- ColorPixels as accepted by compile_probes(), or the result
+                  of compile_probes().
+        """
+        if not isinstance(probes, Inputs.Probes):
+            probes = Inputs.compile_probes(probes)
+
+        rgb = Frame.get_pixels(probes.xs, probes.ys).astype(numpy.int32)
+        packed = rgb[..., 0] << 16 | rgb[..., 1] << 8 | rgb[..., 2]
+        matches = (packed[:, :, None] == probes.targets[:, None, :]).any(axis=(1, 2))
+        return dict(zip(probes.keys, matches.tolist()))
+
+    @staticmethod
+    def snapshot(x_start: int, y_start: int, x_end: int, y_end: int, step: int = 4) -> numpy.ndarray:
+        """Capture a new frame and return a downsampled copy of the area.
+
+        Only every step-th pixel in both directions is kept, which is plenty
+        to tell if the area changed. See wait_until_stable(). Coordinates are
+        relative to the game, like ocr() takes them.
+        """
+        x_start += Window.x
+        x_end += Window.x
+        y_start += Window.y
+        y_end += Window.y
+        frame = Frame.capture()
+        # Bitmaps are created with a 8px border
+        return frame[y_start + 8:y_end + 8:step, x_start + 8:x_end + 8:step].astype(numpy.int16)
+
+    @staticmethod
+    def __same_snapshot(a: numpy.ndarray, b: numpy.ndarray, tolerance: float) -> bool:
+        """Check if at most a tolerance fraction of the pixels differ."""
+        if a.shape != b.shape:
+            return False
+        changed = (numpy.abs(a - b) > 8).any(axis=2)
+        return changed.mean() <= tolerance
+
+    @staticmethod
+    def wait_until_stable(area: Tuple[int, int, int, int], max_wait: float,
+                          reference: Optional[numpy.ndarray] = None, step: int = 4,
+                          tolerance: float = 0.01, poll: float = 0.02) -> bool:
+        """Wait until an area of the window stops changing.
+
+        Returns True as soon as two consecutive snapshots of the area match
+        and differ from reference, or False if that didn't happen within
+        max_wait seconds.
+
+        Keyword arguments
+        area      -- x_start, y_start, x_end, y_end of the area, e.g. an OCRBox.
+        max_wait  -- The longest time to wait in seconds.
+        reference -- A snapshot() of the area taken before the input the
+                     area should react to, usually a click.
+        step      -- Downsampling of the snapshots, see snapshot().
+        tolerance -- Fraction of pixels that may change while the area still
+                     counts as stable, so small animations don't hold it up.
+        poll      -- Time in seconds between snapshots.
+        """
+        deadline = time.perf_counter() + max_wait
+        previous = None
+        while True:
+            current = Inputs.snapshot(*area, step)
+            if (previous is not None and Inputs.__same_snapshot(current, previous, tolerance) and
+                    (reference is None or not Inputs.__same_snapshot(current, reference, tolerance))):
+                return True
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            previous = current
+            time.sleep(min(poll, remaining))
+
     @staticmethod
     def remove_spaces(s: str) -> str:
         """Remove all spaces from string."""
@@ -395,20 +968,43 @@ class Inputs:
         return path
 
     @staticmethod
-    def ocr_number(x_1: int, y_1: int, x_2: int, y_2: int) -> int:
+    def ocr_digits(x_1: int, y_1: int, x_2: int, y_2: int, bmp: Image = None, **kwargs) -> str:
+        """Read a line of numbers in the game's UI font.
+
+        Uses the learned glyphs (see classes.glyphs) and falls back to ocr(),
+        called with kwargs, if they're missing, didn't find a digit or found
+        an unknown glyph next to one. The area is cropped from bmp if it's
+        given.
+        """
+        text = Glyphs.read(x_1, y_1, x_2, y_2, bmp=bmp)
+        if text is None or not any(c.isdigit() for c in text):
+            text = Inputs.ocr(x_1, y_1, x_2, y_2, bmp=bmp, cropb=bmp is not None, **kwargs)
+        return text
+
+    @staticmethod
+    def ocr_number(x_1: int, y_1: int, x_2: int, y_2: int, bmp: Image = None) -> int:
         """Remove all non-digits."""
-        return int(Inputs.remove_letters(Inputs.ocr(x_1, y_1, x_2, y_2)))
+        return int(Inputs.remove_letters(Inputs.ocr_digits(x_1, y_1, x_2, y_2, bmp=bmp,
+                                                           profile=coords.OCR_PROFILE_NUMBER)))
 
     @staticmethod
-    def ocr_notation(x_1: int, y_1: int, x_2: int, y_2: int) -> int:
+    def ocr_notation(x_1: int, y_1: int, x_2: int, y_2: int, bmp: Image = None) -> int:
         """Convert scientific notation from string to int."""
-        return int(float(Inputs.ocr(x_1, y_1, x_2, y_2)))
+        return int(float(Inputs.remove_spaces(Inputs.ocr_digits(x_1, y_1, x_2, y_2, bmp=bmp,
+                                                                profile=coords.OCR_PROFILE_NUMBER))))
 
     @staticmethod
-    def save_screenshot() -> None:
-        """Save a screenshot of the game."""
+    def save_screenshot(full: bool = False) -> None:
+        """Save a screenshot of the game.
+
+        Keyword arguments
+        full -- Save the whole window including its borders instead of just
+                the game. Full screenshots can be replayed with
+                classes.framesource.ReplayFrameSource.
+        """
         bmp = Inputs.get_bitmap()
-        bmp = bmp.crop((Window.x + 8, Window.y + 8, Window.x + 968, Window.y + 608))
+        if not full:
+            bmp = bmp.crop((Window.x + 8, Window.y + 8, Window.x + 968, Window.y + 608))
         if not os.path.exists("screenshots"):
             os.mkdir("screenshots")
         bmp.save('screenshots/' + datetime.datetime.now().strftime('%d-%m-%y-%H-%M-%S') + '.png')
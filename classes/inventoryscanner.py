@@ -0,0 +1,111 @@
+"""InventoryScanner class identifies the items in the inventory slots."""
+from typing import Dict, Iterable, List, Tuple
+
+import cv2
+import numpy
+from PIL import Image
+
+import coordinates as coords
+from classes.frame import Frame
+from classes.inputs import Inputs
+from classes.templates import Templates
+from classes.window import Window
+
+
+class InventoryScanner:
+    """This class identifies inventory items by their perceptual hash.
+
+    A page of the inventory is cut into slot tiles and each tile is reduced
+    to a 64 bit difference hash, which is compared with the hashes of the
+    item pictures in images/. Pictures must show the whole item icon, like
+    the glop pictures do, since the tile around the slot center is hashed.
+    """
+
+    hash_size = 8
+    # the most bits a tile hash may differ from a picture hash to match
+    max_distance = 10
+    # slot centers aren't pixel perfect, tiles are hashed at offsets up to
+    # shift pixels from them in steps of shift_step pixels
+    shift = 4
+    shift_step = 2
+
+    # filename -> hash of the picture
+    index: Dict[str, numpy.ndarray] = {}
+
+    @staticmethod
+    def hash(image: numpy.ndarray) -> numpy.ndarray:
+        """Return the difference hash of a grayscale image as a bool array."""
+        small = cv2.resize(image, (InventoryScanner.hash_size + 1, InventoryScanner.hash_size),
+                           interpolation=cv2.INTER_AREA).astype(numpy.int16)
+        return (small[:, 1:] > small[:, :-1]).ravel()
+
+    @staticmethod
+    def get_hash(item: str) -> numpy.ndarray:
+        """Return the hash of the picture images/item, hashing it once."""
+        if item not in InventoryScanner.index:
+            template = Templates.get(Inputs.get_file_path("images", item))
+            InventoryScanner.index[item] = InventoryScanner.hash(template)
+        return InventoryScanner.index[item]
+
+    @staticmethod
+    def slot_center(slot: int) -> Tuple[int, int]:
+        """Return the center of slot on the current page, counting from 1.
+
+        Same coordinates as Inventory.get_inventory_slots().
+        """
+        row, col = divmod(slot - 1, 12)
+        return coords.INVENTORY_SLOTS.x + (col + 1) * 50, coords.INVENTORY_SLOTS.y + row * 50
+
+    @staticmethod
+    def __tile_hashes(gray: numpy.ndarray, slots: int, size: Tuple[int, int]) -> numpy.ndarray:
+        """Hash the tiles of size width, height around every slot.
+
+        Returns an array of shape (slots, offsets, bits).
+        """
+        width, height = size
+        shifts = range(-InventoryScanner.shift, InventoryScanner.shift + 1, InventoryScanner.shift_step)
+        hashes: List[List[numpy.ndarray]] = []
+        for slot in range(1, slots + 1):
+            # Bitmaps are created with a 8px border
+            x, y = InventoryScanner.slot_center(slot)
+            x1, y1 = x + Window.x + 8 - width // 2, y + Window.y + 8 - height // 2
+            hashes.append([InventoryScanner.hash(gray[y1 + dy:y1 + dy + height, x1 + dx:x1 + dx + width])
+                           for dy in shifts for dx in shifts])
+        return numpy.array(hashes)
+
+    @staticmethod
+    def scan(items: Iterable[str], slots: int = coords.INVENTORY_PAGE_SLOTS, bmp: Image = None) -> Dict[int, str]:
+        """Identify the items in the slots of the current inventory page.
+
+        Returns a dict of slot number, counting from 1, to the filename of
+        the item in it, for the slots holding one of items.
+
+        Keyword arguments
+        items -- Filenames of item pictures in images/.
+        slots -- How many slots of the page to look at.
+        bmp   -- a bitmap from the get_bitmap() function, if not passed the
+                 cached frame is used.
+        """
+        frame = numpy.asarray(bmp) if bmp else Frame.get()
+        gray = cv2.cvtColor(numpy.ascontiguousarray(frame), cv2.COLOR_RGB2GRAY)
+
+        # Tiles are cut to the size of the pictures, group them by size
+        by_size: Dict[Tuple[int, int], List[str]] = {}
+        for item in items:
+            height, width = Templates.get(Inputs.get_file_path("images", item)).shape
+            by_size.setdefault((width, height), []).append(item)
+
+        best = numpy.full(slots, InventoryScanner.max_distance + 1)
+        found = numpy.full(slots, None, dtype=object)
+        for size, names in by_size.items():
+            tiles = InventoryScanner.__tile_hashes(gray, slots, size)
+            index = numpy.array([InventoryScanner.get_hash(name) for name in names])
+            # distance of every slot to every picture, at the best offset
+            distances = (tiles[:, :, None, :] != index[None, None, :, :]).sum(axis=3).min(axis=1)
+            closest = distances.argmin(axis=1)
+            distance = distances[numpy.arange(slots), closest]
+            better = distance < best
+            best[better] = distance[better]
+            found[better] = numpy.array(names, dtype=object)[closest[better]]
+
+        return {slot + 1: name for slot, name in enumerate(found) if name is not None}
@@ -12,14 +12,23 @@ class Navigation:
     # equipment = coords.EQUIPMENT_SLOTS # deprecated?
     current_menu = ''
     
+    @staticmethod
+    def __click(x: int, y: int, max_wait: float) -> None:
+        """Click at x, y and wait until the menu content has been redrawn.
+
+        Waits at most max_wait seconds, which is all it used to sleep.
+        """
+        before = Inputs.snapshot(*coords.MENU_CONTENT_AREA)
+        Inputs.click(x, y)
+        Inputs.wait_until_stable(coords.MENU_CONTENT_AREA, max_wait, before)
+    
     @staticmethod
     def menu(target :str) -> None:
         """Navigate through main menu."""
         target = target.lower()
         if Navigation.current_menu == target:
             return
-        Inputs.click(*Navigation.menus[target])
-        time.sleep(userset.LONG_SLEEP)
+        Navigation.__click(*Navigation.menus[target], userset.LONG_SLEEP)
         Navigation.current_menu = target
     
     @staticmethod
@@ -33,8 +42,7 @@ class Navigation:
         """Click rebirth menu."""
         if Navigation.current_menu == 'rebirth':
             return
-        Inputs.click(*coords.REBIRTH)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.REBIRTH, userset.SHORT_SLEEP)
         Navigation.current_menu = 'rebirth'
     
     @staticmethod
@@ -42,21 +50,18 @@ class Navigation:
         if Navigation.current_menu == 'challenges':
             return
         Navigation.rebirth()
-        Inputs.click(*coords.CHALLENGE_BUTTON)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.CHALLENGE_BUTTON, userset.SHORT_SLEEP)
         Navigation.current_menu == 'challenges'
     
     @staticmethod
     def challenge_quit() -> None:
         Navigation.challenges()
-        Inputs.click(*coords.CHALLENGE_QUIT)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.CHALLENGE_QUIT, userset.SHORT_SLEEP)
 
     @staticmethod
     def confirm() -> None:
         """Click yes in confirm window."""
-        Inputs.click(*coords.CONFIRM)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.CONFIRM, userset.SHORT_SLEEP)
     
     @staticmethod
     def ngu_magic() -> None:
@@ -64,8 +69,7 @@ class Navigation:
         if Navigation.current_menu == 'ngu_magic':
             return
         Navigation.menu('ngu')
-        Inputs.click(*coords.NGU_MAGIC)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.NGU_MAGIC, userset.SHORT_SLEEP)
         Navigation.current_menu = 'ngu_magic'
     
     @staticmethod
@@ -73,8 +77,7 @@ class Navigation:
         """Navigate to EXP Menu."""
         if Navigation.current_menu == 'exp':
             return
-        Inputs.click(*coords.XP_MENU)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.XP_MENU, userset.SHORT_SLEEP)
         Navigation.current_menu = 'exp'
     
     @staticmethod
@@ -83,8 +86,7 @@ class Navigation:
         if Navigation.current_menu == 'exp_magic':
             return
         Navigation.exp()
-        Inputs.click(*coords.MAGIC_MENU)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.MAGIC_MENU, userset.SHORT_SLEEP)
         Navigation.current_menu = 'exp_magic'
     
     @staticmethod
@@ -93,8 +95,7 @@ class Navigation:
         if Navigation.current_menu == "exp_adventure":
             return
         Navigation.exp()
-        Inputs.click(*coords.ADVENTURE_MENU)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.ADVENTURE_MENU, userset.SHORT_SLEEP)
         Navigation.current_menu = "exp_adventure"
     
     @staticmethod
@@ -103,8 +104,7 @@ class Navigation:
         if Navigation.current_menu == "exp_rich":
             return
         Navigation.exp()
-        Inputs.click(*coords.RICH_MENU)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.RICH_MENU, userset.SHORT_SLEEP)
         Navigation.current_menu = "exp_rich"
     
     @staticmethod
@@ -113,8 +113,7 @@ class Navigation:
         if Navigation.current_menu == "exp_hack":
             return
         Navigation.exp()
-        Inputs.click(*coords.EXP_HACK_MENU)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.EXP_HACK_MENU, userset.SHORT_SLEEP)
         Navigation.current_menu = "exp_hack"
     
     @staticmethod
@@ -122,8 +121,7 @@ class Navigation:
         """Click info 'n stuff."""
         if Navigation.current_menu == 'info':
             return
-        Inputs.click(*coords.INFO)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.INFO, userset.SHORT_SLEEP)
         Navigation.current_menu = 'info'
     
     @staticmethod
@@ -132,8 +130,7 @@ class Navigation:
         if Navigation.current_menu == 'misc':
             return
         Navigation.info()
-        Inputs.click(*coords.MISC)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.MISC, userset.SHORT_SLEEP)
         Navigation.current_menu = 'misc'
     
     @staticmethod
@@ -142,8 +139,7 @@ class Navigation:
         if Navigation.current_menu == 'perks':
             return
         Navigation.menu('adventure')
-        Inputs.click(*coords.ITOPOD_PERKS)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.ITOPOD_PERKS, userset.SHORT_SLEEP)
         Navigation.current_menu = 'perks'
     
     @staticmethod
@@ -152,8 +148,7 @@ class Navigation:
         if Navigation.current_menu == 'spells':
             return
         Navigation.menu('bloodmagic')
-        Inputs.click(*coords.BM_SPELL)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.BM_SPELL, userset.SHORT_SLEEP)
         Navigation.current_menu = 'spells'
     
     @staticmethod
@@ -161,8 +156,7 @@ class Navigation:
         """Navigate to sellout shop."""
         if Navigation.current_menu == 'sellout':
             return
-        Inputs.click(*coords.SELLOUT)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.SELLOUT, userset.SHORT_SLEEP)
         Navigation.current_menu = "sellout"
     
     @staticmethod
@@ -171,8 +165,7 @@ class Navigation:
         if Navigation.current_menu == 'boost_2':
             return
         Navigation.sellout()
-        Inputs.click(*coords.SELLOUT_BOOST_2)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.SELLOUT_BOOST_2, userset.SHORT_SLEEP)
         Navigation.current_menu = "boost_2"
     
     @staticmethod
@@ -181,6 +174,5 @@ class Navigation:
         if Navigation.current_menu == 'stat_breakdown':
             return
         Navigation.misc()
-        Inputs.click(*coords.STAT_BREAKDOWN)
-        time.sleep(userset.SHORT_SLEEP)
+        Navigation.__click(*coords.STAT_BREAKDOWN, userset.SHORT_SLEEP)
         Navigation.current_menu = 'stat_breakdown'
@@ -0,0 +1,135 @@
+"""OCR engines turn images of text into strings for Inputs.ocr()."""
+import shlex
+import threading
+from typing import Dict, Hashable, List, Tuple
+
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:  # pytesseract is used instead
+    tesserocr = None
+
+
+class OCREngine:
+    """Base class for everything that can read text from images."""
+
+    name = ""
+
+    def image_to_string(self, image: Image, config: str = "") -> str:
+        """Read the text in image, config takes tesseract command line options."""
+        raise NotImplementedError
+
+    def image_to_words(self, image: Image, config: str = "") -> List[Tuple[str, int, int, Hashable]]:
+        """Read the words in image in reading order.
+
+        Returns the text, top and bottom of every word, and a key that is
+        the same for words on the same line.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Free any resources held by the engine."""
+
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract executable through pytesseract.
+
+    Every read writes a temporary file and starts a new tesseract process,
+    which loads the language model again.
+    """
+
+    name = "pytesseract"
+
+    def image_to_string(self, image: Image, config: str = "") -> str:
+        """Read the text in image, config takes tesseract command line options."""
+        return pytesseract.image_to_string(image, config=config)
+
+    def image_to_words(self, image: Image, config: str = "") -> List[Tuple[str, int, int, Hashable]]:
+        """Read the words in image in reading order, see OCREngine.image_to_words()."""
+        data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+        words = []
+        for i, text in enumerate(data["text"]):
+            if data["level"][i] == 5 and text.strip():
+                line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+                words.append((text, data["top"][i], data["top"][i] + data["height"][i], line))
+        return words
+
+
+class TesserocrEngine(OCREngine):
+    """Runs tesseract in this process through tesserocr.
+
+    An API handle is initialized the first time a config is used and kept
+    for later reads, so the language model is only loaded once. Reads are
+    serialized, a handle can't be used by two threads at the same time.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = "eng") -> None:
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed.")
+        self.lang = lang
+        self.apis = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def parse_config(config: str) -> Tuple[int, Dict[str, str]]:
+        """Split tesseract command line options into the page segmentation
+        mode and the variables set with -c."""
+        psm = 3  # tesseract's default
+        variables = {}
+        tokens = shlex.split(config)
+        for option, value in zip(tokens, tokens[1:]):
+            if option == "--psm":
+                psm = int(value)
+            elif option == "-c":
+                name, _, setting = value.partition("=")
+                variables[name] = setting
+        return psm, variables
+
+    def __get_api(self, config: str) -> "tesserocr.PyTessBaseAPI":
+        """Return the API handle for config, creating it on first use."""
+        if config not in self.apis:
+            psm, variables = TesserocrEngine.parse_config(config)
+            api = tesserocr.PyTessBaseAPI(lang=self.lang, psm=psm)
+            for name, setting in variables.items():
+                api.SetVariable(name, setting)
+            self.apis[config] = api
+        return self.apis[config]
+
+    def image_to_string(self, image: Image, config: str = "") -> str:
+        """Read the text in image, config takes tesseract command line options."""
+        if image.mode == "1":
+            image = image.convert("L")
+        with self.lock:
+            api = self.__get_api(config)
+            api.SetImage(image)
+            return api.GetUTF8Text()
+
+    def image_to_words(self, image: Image, config: str = "") -> List[Tuple[str, int, int, Hashable]]:
+        """Read the words in image in reading order, see OCREngine.image_to_words()."""
+        if image.mode == "1":
+            image = image.convert("L")
+        words = []
+        with self.lock:
+            api = self.__get_api(config)
+            api.SetImage(image)
+            api.Recognize()
+            line = 0
+            for word in tesserocr.iterate_level(api.GetIterator(), tesserocr.RIL.WORD):
+                if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line += 1
+                text = word.GetUTF8Text(tesserocr.RIL.WORD)
+                box = word.BoundingBox(tesserocr.RIL.WORD)
+                if text and text.strip() and box:
+                    words.append((text, box[1], box[3], line))
+        return words
+
+    def close(self) -> None:
+        """Free the API handles, the next read creates new ones."""
+        with self.lock:
+            for api in self.apis.values():
+                api.End()
+            self.apis = {}
@@ -1,5 +1,7 @@
 """Handles various statistics."""
 from __future__ import annotations # With the help of the broken time machine
+from collections import deque
+from concurrent.futures import Future
 from typing import Tuple
 
 import datetime
@@ -58,6 +60,26 @@ class Stats:
                 Stats.OCR_failures = 0
                 Stats.OCR_failed = True
 
+    @staticmethod
+    def read_value_async(value :str) -> Future:
+        """Navigate to value and start reading it in the background.
+
+        Returns a future of the value, see Inputs.ocr_async(). Unlike
+        set_value_with_ocr() a failed read isn't retried, the future raises
+        ValueError instead.
+        """
+        if value == "TOTAL XP":
+            Navigation.misc()
+            return Inputs.ocr_async(*coords.OCR_TOTAL_EXP, reader=Inputs.ocr_notation)
+        elif value == "XP":
+            Navigation.exp()
+            return Inputs.ocr_async(*coords.OCR_EXP, reader=Inputs.ocr_number)
+        elif value == "PP":
+            Navigation.perks()
+            Misc.waste_click()
+            return Inputs.ocr_async(*coords.OCR_PP, reader=Inputs.ocr_number)
+        raise ValueError(f"Unknown value {value}")
+
 class EstimateRate:
 
     def __init__(self :EstimateRate, duration :int, mode :str ='moving_average') -> None:
@@ -73,6 +95,8 @@ class EstimateRate:
         self.dtime_log = []
         self.dxp_log = []
         self.dpp_log = []
+        # Runs whose values are still being read, with the time they ended
+        self.pending = deque()
         # Num runs to keep for moving average
         self.__keep_runs = userset.E_RATE_KEEP_RUNS // duration
         self.__iteration = 0
@@ -101,6 +125,7 @@ class EstimateRate:
         return avg_xp, avg_pp
 
     def rates(self :EstimateRate) -> Tuple[float, float]:
+        self.__resolve()
         try:
             xpr, ppr = self.__alg[self.mode]()
             return round(3600 * xpr), round(3600 * ppr)
@@ -108,8 +133,19 @@ class EstimateRate:
             return 0, 0
 
     def stop_watch(self :EstimateRate) -> None:
-        """This method needs to be called for rate estimations"""
+        """This method needs to be called for rate estimations
+
+        With usersettings.ASYNC_STATS the values are only captured here and
+        read in the background, they're added to the estimate once they're
+        read, the latest at the next call.
+        """
         self.__iteration += 1
+        if userset.ASYNC_STATS:
+            self.__resolve()
+            xp = Stats.read_value_async("XP") if Stats.track_xp else None
+            pp = Stats.read_value_async("PP") if Stats.track_pp else None
+            self.pending.append((time.time(), xp, pp))
+            return
         if Stats.track_xp:
             Stats.set_value_with_ocr("XP")
             if not Stats.OCR_failed:
@@ -137,9 +173,45 @@ class EstimateRate:
         self.last_timestamp = time.time()
         print("This run: {:^8}{:^3}This run: {:^8}".format(Helper.human_format(dxp), "|", Helper.human_format(dpp)))
 
+    def __resolve(self :EstimateRate, wait :bool =False) -> None:
+        """Add the runs whose values have been read to the logs, in order.
+
+        Keyword arguments
+        wait -- Wait for the runs that are still being read. (default False)
+        """
+        while self.pending:
+            timestamp, xp, pp = self.pending[0]
+            if not wait and not all(f.done() for f in (xp, pp) if f is not None):
+                return
+            self.pending.popleft()
+            try:
+                cxp = xp.result() if xp is not None else self.last_xp
+                cpp = pp.result() if pp is not None else self.last_pp
+            except ValueError:
+                print("Problems with OCR, skipping stats for this run")
+                Stats.OCR_failed = True
+                self.last_timestamp = timestamp
+                continue
+            Stats.OCR_failed = False
+            Stats.xp, Stats.pp = cxp, cpp
+            dxp = cxp - self.last_xp
+            dpp = cpp - self.last_pp
+            if Stats.track_xp:
+                self.dxp_log.append(dxp)
+            if Stats.track_pp:
+                self.dpp_log.append(dpp)
+            self.last_xp, self.last_pp = cxp, cpp
+            self.dtime_log.append(timestamp - self.last_timestamp)
+            self.last_timestamp = timestamp
+            print("This run: {:^8}{:^3}This run: {:^8}".format(Helper.human_format(dxp), "|", Helper.human_format(dpp)))
+
     def update_xp(self :EstimateRate) -> None:
         """This method is used to update last xp after upgrade spends"""
-        self.last_xp = Stats.xp
+        # Runs read in the background were measured before the spend
+        xp = Stats.xp
+        self.__resolve(wait=True)
+        Stats.xp = xp
+        self.last_xp = xp
 
 class Tracker:
     """
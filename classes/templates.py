@@ -0,0 +1,127 @@
+"""Templates class keeps the images used by image searches in memory."""
+import glob
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy
+
+
+class Templates:
+    """This class caches grayscale template images.
+
+    Every template is read from disk once and kept in memory, together with
+    any scaled variants that were asked for. Files are checked for changes
+    at most every check_interval seconds and reloaded if their mtime changed.
+    Templates can be used from several threads, see Inputs.match_templates().
+    """
+
+    # resolution the images are made for
+    base_resolution = (960, 600)
+    check_interval = 5.0
+
+    # path -> (mtime, time of last check)
+    files: Dict[str, Tuple[float, float]] = {}
+    # (path, resolution) -> grayscale template
+    cache: Dict[Tuple[str, Optional[Tuple[int, int]]], numpy.ndarray] = {}
+    # (path, level) -> template downscaled level times with cv2.pyrDown
+    levels: Dict[Tuple[str, int], numpy.ndarray] = {}
+
+    # counters
+    loads = 0
+    hits = 0
+
+    # guards the dicts above, get() calls itself for scaled variants
+    lock = threading.RLock()
+
+    @staticmethod
+    def __check(path: str) -> None:
+        """Drop all variants of path if the file changed since it was loaded."""
+        now = time.perf_counter()
+        if path in Templates.files:
+            mtime, checked = Templates.files[path]
+            if now - checked < Templates.check_interval:
+                return
+            if os.stat(path).st_mtime == mtime:
+                Templates.files[path] = mtime, now
+                return
+        for variants in (Templates.cache, Templates.levels):
+            for key in [key for key in variants if key[0] == path]:
+                del variants[key]
+        Templates.files[path] = os.stat(path).st_mtime, now
+
+    @staticmethod
+    def get(path: str, resolution: Optional[Tuple[int, int]] = None) -> numpy.ndarray:
+        """Return the template at path as a grayscale array.
+
+        Keyword arguments
+        path       -- Path to the image.
+        resolution -- Resolution of the game window, if set the template is
+                      scaled from base_resolution to it.
+        """
+        path = os.path.abspath(path)
+        with Templates.lock:
+            Templates.__check(path)
+            if resolution == Templates.base_resolution:
+                resolution = None
+
+            key = path, resolution
+            if key in Templates.cache:
+                Templates.hits += 1
+                return Templates.cache[key]
+
+            if resolution is None:
+                template = cv2.imread(path, 0)
+                if template is None:
+                    raise RuntimeError(f"Couldn't read template {path}.")
+                Templates.loads += 1
+            else:
+                template = Templates.get(path)
+                height, width = template.shape
+                size = (max(round(width * resolution[0] / Templates.base_resolution[0]), 1),
+                        max(round(height * resolution[1] / Templates.base_resolution[1]), 1))
+                template = cv2.resize(template, size, interpolation=cv2.INTER_AREA)
+            template.flags.writeable = False
+            Templates.cache[key] = template
+            return template
+
+    @staticmethod
+    def get_level(path: str, level: int) -> numpy.ndarray:
+        """Return the template at path halved level times with cv2.pyrDown.
+
+        Search areas downscaled the same way can be matched against it, see
+        Inputs.image_search().
+        """
+        with Templates.lock:
+            template = Templates.get(path)
+            key = os.path.abspath(path), level
+            if key not in Templates.levels:
+                for _ in range(level):
+                    template = cv2.pyrDown(template)
+                template.flags.writeable = False
+                Templates.levels[key] = template
+            return Templates.levels[key]
+
+    @staticmethod
+    def preload(directory: str = None) -> None:
+        """Load every PNG under directory, the images folder by default."""
+        if directory is None:
+            working = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            directory = os.path.join(working, "images")
+        for path in glob.glob(os.path.join(directory, "**", "*.png"), recursive=True):
+            Templates.get(path)
+
+    @staticmethod
+    def clear() -> None:
+        """Forget all templates, they are read from disk again when needed."""
+        with Templates.lock:
+            Templates.files.clear()
+            Templates.cache.clear()
+            Templates.levels.clear()
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        """Return how many templates were read from disk and from memory."""
+        return {"loads": Templates.loads, "hits": Templates.hits, "cached": len(Templates.cache)}
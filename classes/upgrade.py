@@ -4,7 +4,7 @@ import math
 
 from classes.stats  import Stats
 from classes.helper import Helper
-from classes.features import Navigation
+from classes.features import Misc, Navigation
 from classes.inputs import Inputs
 
 import coordinates  as coords
@@ -123,6 +123,7 @@ class UpgradeEM:
         Inputs.click(*coords.EM_POW_BUY)
         Inputs.click(*coords.EM_CAP_BUY)
         Inputs.click(*coords.EM_BAR_BUY)
+        Misc.clear_breakdowns()
 
         Stats.set_value_with_ocr("XP")
 
@@ -371,6 +372,7 @@ class UpgradeHackPower(Stats):
             Inputs.click(*coords.EM_CAP_BUY)
         if h_bars > 0:
             Inputs.click(*coords.EM_BAR_BUY)
+        Misc.clear_breakdowns()
 
         Stats.set_value_with_ocr("XP")
 
@@ -3,9 +3,17 @@ import ctypes
 import platform
 from typing import Tuple
 
-import win32gui
+import numpy
 from deprecated import deprecated
 
+import usersettings as userset
+from classes.framesource import FrameSource, ReplayFrameSource, Win32FrameSource
+
+try:
+    import win32gui
+except ImportError:  # Replaying recorded frames works without pywin32
+    win32gui = None
+
 
 class Window:
     """This class contains game window coordinates."""
@@ -19,13 +27,30 @@ class Window:
     cx = x
     cy = y
 
+    # where frames and window geometry come from
+    source: FrameSource = None
+
+    # cached geometry, see refresh_geometry()
+    __rect_size = None
+    __resolution = None
+    __borders = None
+
     @deprecated(reason="Window() -Window instantiation- is deprecated, use Window.init() instead")
     def __init__(self, debug=False):
         Window.init(debug)
 
     @staticmethod
     def init(debug: bool = False):
-        """Finds the game window and returns its coords."""
+        """Finds the game window and returns its coords.
+
+        If usersettings.FRAME_SOURCE is "replay", recorded frames from
+        usersettings.REPLAY_PATH are used instead of the game window.
+        """
+        if userset.FRAME_SOURCE == "replay":
+            Window.source = ReplayFrameSource(userset.REPLAY_PATH)
+            Window.refresh_geometry()
+            return
+
         if platform.release() == "10":
             ctypes.windll.shcore.SetProcessDpiAwareness(2)
         else:
@@ -41,6 +66,13 @@ class Window:
         if len(windows) == 0:
             raise RuntimeError("Game window not found.")
         Window.id = windows[0]
+        Window.source = Win32FrameSource(Window.id)
+        Window.refresh_geometry()
+
+    @staticmethod
+    def replaying() -> bool:
+        """Return True if frames come from recordings, inputs aren't sent then."""
+        return isinstance(Window.source, ReplayFrameSource)
 
     @staticmethod
     def set_pos(x: int, y: int) -> None:
@@ -56,14 +88,12 @@ class Window:
     @staticmethod
     def get_rect_size() -> Tuple[int, int]:
         """Returns the resolution of the whole rect"""
-        rect = win32gui.GetWindowRect(Window.id)
-        return rect[2] - rect[0], rect[3] - rect[1]
+        return Window.source.get_rect_size()
 
     @staticmethod
     def get_rect_size_client() -> Tuple[int, int]:
         """Returns the resolution of the game window"""
-        rect = win32gui.GetClientRect(Window.id)
-        return rect[2] - rect[0], rect[3] - rect[1]
+        return Window.source.get_rect_size_client()
 
     @staticmethod
     def get_rect_borders() -> Tuple[int, int]:
@@ -72,20 +102,53 @@ class Window:
         rect2 = Window.get_rect_size_client()
         return int((rect1[0] - rect2[0]) / 2), rect1[1] - rect2[1] - int((rect1[0] - rect2[0]) / 2)
 
+    @staticmethod
+    def refresh_geometry() -> None:
+        """Query and cache the resolution and borders used by coord_manager().
+
+        Frame captures call this when the window size changes, call it
+        yourself if the window is changed some other way.
+        """
+        Window.__rect_size = Window.get_rect_size()
+        Window.__resolution = Window.get_rect_size_client()
+        Window.__borders = Window.get_rect_borders()
+
+    @staticmethod
+    def check_geometry(rect_size: Tuple[int, int]) -> None:
+        """Refresh the cached geometry if rect_size doesn't match it."""
+        if rect_size != Window.__rect_size:
+            Window.refresh_geometry()
+
     @staticmethod
     def coord_manager(x: int, y: int) -> Tuple[int, int]:
         """"Scales coordinates based on resolution and adds borders"""
-        resolution = Window.get_rect_size_client()
+        if Window.__resolution is None:
+            Window.refresh_geometry()
+        resolution = Window.__resolution
         base_resolution = (960, 600)
         x = int(x / base_resolution[0] * resolution[0])
         y = int(y / base_resolution[1] * resolution[1])
 
-        borders = Window.get_rect_borders()
+        borders = Window.__borders
         x += borders[0]
         y += borders[1]
 
         return x, y
 
+    @staticmethod
+    def coord_manager_many(xs: numpy.ndarray, ys: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Same as coord_manager() for arrays of coordinates."""
+        if Window.__resolution is None:
+            Window.refresh_geometry()
+        resolution = Window.__resolution
+        base_resolution = (960, 600)
+        # Same operations as coord_manager(), astype truncates like int() does
+        xs = (numpy.asarray(xs) / base_resolution[0] * resolution[0]).astype(numpy.intp)
+        ys = (numpy.asarray(ys) / base_resolution[1] * resolution[1]).astype(numpy.intp)
+
+        borders = Window.__borders
+        return xs + borders[0], ys + borders[1]
+
     @staticmethod
     def coord_manager_area(x1: int, y1: int, x2: int, y2: int) -> Tuple[int, int, int, int]:
         coords1 = Window.coord_manager(x1, y1)
@@ -103,3 +166,4 @@ class Window:
             win32gui.MoveWindow(Window.id, x, 1000, 1000, 800, False)
         for y in reversed(range(1000)):
             win32gui.MoveWindow(Window.id, 0, y, 1000, 800, False)
+        Window.refresh_geometry()
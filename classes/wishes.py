@@ -41,20 +41,23 @@ class Wishes:
     def get_breakdowns(self):
         """Go to stat breakdowns and fetch the necessary stats."""
         Navigation.stat_breakdown()
+        bmps = []
         Inputs.click(*coords.BREAKDOWN_E)
         time.sleep(userset.MEDIUM_SLEEP)
-        print("OCR is scanning a large area, this might take a few seconds")
-        e_list = self.fix_text(Inputs.ocr(*coords.OCR_BREAKDOWN))
+        bmps.append(Inputs.get_bitmap())
         Inputs.click(*coords.BREAKDOWN_M)
         time.sleep(userset.MEDIUM_SLEEP)
-        m_list = self.fix_text(Inputs.ocr(*coords.OCR_BREAKDOWN))
+        bmps.append(Inputs.get_bitmap())
         Inputs.click(*coords.BREAKDOWN_R)
         time.sleep(userset.MEDIUM_SLEEP)
-        r_list = self.fix_text(Inputs.ocr(*coords.OCR_BREAKDOWN))
+        bmps.append(Inputs.get_bitmap())
         Inputs.click(*coords.BREAKDOWN_MISC)
         time.sleep(userset.MEDIUM_SLEEP)
         Inputs.click_drag(*coords.BREAKDOWN_MISC_SCROLL_DRAG_START, *coords.BREAKDOWN_MISC_SCROLL_DRAG_END)
-        misc_list = self.fix_text(Inputs.ocr(*coords.OCR_BREAKDOWN))
+        bmps.append(Inputs.get_bitmap())
+        print("OCR is scanning a large area, this might take a few seconds")
+        texts = Inputs.ocr_batch([coords.OCR_BREAKDOWN] * len(bmps), bmps=bmps)
+        e_list, m_list, r_list, misc_list = (self.fix_text(text) for text in texts)
 
         fields = ["total energy power:", "total magic power:", "total r power:", "total wish speed:"]
 
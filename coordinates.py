@@ -4,6 +4,18 @@ from collections import namedtuple
 Pixel = namedtuple('Pixel', 'x y')
 ColorPixel = namedtuple('ColorPixel', Pixel._fields + ('color',))
 OCRBox = namedtuple('OCRBox', 'x1 y1 x2 y2')
+OCRProfile = namedtuple('OCRProfile', 'threshold crop scale sharpen')
+
+# OCR PROFILES
+# How Inputs.ocr() prepares an area before reading it. Pixels brighter than
+# threshold turn white and the rest black (0 keeps the grayscale), crop cuts
+# the area down to its text, scale enlarges it and sharpen sharpens it.
+OCR_PROFILE_DEFAULT = OCRProfile(threshold=0, crop=False, scale=4, sharpen=True)
+OCR_PROFILE_RAW = OCRProfile(threshold=0, crop=False, scale=1, sharpen=False)
+# Single lines of numbers, like OCR_EXP or OCR_BOSS
+OCR_PROFILE_NUMBER = OCRProfile(threshold=0, crop=True, scale=3, sharpen=True)
+# Columns of the stat breakdowns
+OCR_PROFILE_BREAKDOWN = OCRProfile(threshold=220, crop=True, scale=4, sharpen=True)
 
 # USELESSFUL
 WASTE_CLICK = Pixel(900, 590)
@@ -135,6 +147,7 @@ MENU_ITEMS = {
     'yggdrasil': MENU_YGGDRASIL, 'digger': MENU_DIGGERS, 'beard': MENU_BEARD,
     'questing': MENU_QUESTING, 'hacks': MENU_HACKS, 'wishes': MENU_WISHES,
 }
+MENU_CONTENT_AREA = OCRBox(300, 30, 950, 590)
 NUMBER_INPUT_BOX = Pixel(440, 20)
 EXP = Pixel(90, 450)
 SAVE = Pixel(23, 483)
@@ -172,6 +185,7 @@ LOADOUT = {1: Pixel(330, LOADOUT_Y), 2: Pixel(360, LOADOUT_Y), 3: Pixel(390, LOA
 
 INVENTORY_SLOTS = Pixel(300, 330)
 INVENTORY_AREA = OCRBox(315, 290, 930, 560)
+INVENTORY_PAGE_SLOTS = 60
 INVENTORY_PAGE_Y = 574
 INVENTORY_PAGE = [Pixel(364, INVENTORY_PAGE_Y), Pixel(428, INVENTORY_PAGE_Y), Pixel(492, INVENTORY_PAGE_Y), Pixel(560, INVENTORY_PAGE_Y), Pixel(620, INVENTORY_PAGE_Y), Pixel(685, INVENTORY_PAGE_Y)]
 COLOR_INVENTORY_BG = 'B68855'
@@ -224,6 +238,8 @@ AUG_SCROLL_TOP = Pixel(945, 264)
 AUG_SCROLL_BOT = Pixel(945, 575)
 AUG_SCROLL_SANITY_TOP = Pixel(943, 261)
 AUG_SCROLL_SANITY_BOT = Pixel(943, 578)
+IS_AUG_SCROLLED_TOP = ColorPixel(*AUG_SCROLL_SANITY_TOP, SANITY_AUG_SCROLL_COLORS)
+IS_AUG_SCROLLED_BOT = ColorPixel(*AUG_SCROLL_SANITY_BOT, SANITY_AUG_SCROLL_COLORS)
 
 # NGU OFFSETS
 NGU_TARGET = Pixel(635, 205)
@@ -354,6 +370,11 @@ SELLOUT_MUFFIN_BUY = Pixel(860, 255)
 OCR_MUFFIN = OCRBox(785, 204, 936, 240)
 OCR_AP = OCRBox(450, 73, 800, 100)
 
+# Number fields in the game's UI font, calibrate_glyphs.py learns from these
+GLYPH_FIELDS = {"OCR_EXP": OCR_EXP, "OCR_PP": OCR_PP, "OCR_BOSS": OCR_BOSS, "OCR_ENERGY": OCR_ENERGY,
+                "OCR_MAGIC": OCR_MAGIC, "OCR_R3": OCR_R3, "OCR_REBIRTH_TIME": OCR_REBIRTH_TIME,
+                "OCR_QUESTING_QP": OCR_QUESTING_QP, "OCR_AP": OCR_AP}
+
 # EXP COSTS PER UNIT
 EPOWER_COST = 150
 ECAP_COST = 0.004
@@ -465,6 +486,7 @@ COLOR_WANDOOS_MAGIC_BB = ColorPixel(526, 350, ['718DF1', '738FF5'])
 COLOR_MEGA_BUFF_READY = ColorPixel(647, 176, ABILITY_ROW3_READY_COLOR)
 COLOR_ULTIMATE_BUFF_READY = ColorPixel(850, 110, ABILITY_ROW1_READY_COLOR)
 COLOR_REGULAR_ATTACK_READY = ColorPixel(325, 110, ABILITY_ROW1_READY_COLOR)
+COLOR_ABILITY_ROW1_READY = ColorPixel(ABILITY_ROW1X, ABILITY_ROW1Y, ABILITY_ROW1_READY_COLOR)
 
 HACKS = {1: Pixel(570, 230), 2: Pixel(890, 230),
          3: Pixel(570, 320), 4: Pixel(890, 320),
@@ -6,8 +6,8 @@ from typing import NamedTuple
 from classes.features import Adventure
 from classes.helper   import Helper
 from classes.inputs import Inputs
+from classes.inventoryscanner import InventoryScanner
 from classes.navigation import Navigation
-from classes.window import Window
 import coordinates as coords
 import usersettings as userset
 
@@ -44,22 +44,24 @@ class Glop:
 
     @staticmethod
     def update_inventory() -> None:
-        """Scan all inventory pages for glop related items."""
+        """Scan all inventory pages for glop related items.
+
+        Pages are scanned in the background while the next page is opened.
+        """
         Navigation.menu("inventory")
         for item in coords.GLOP_FILENAMES: Glop.reagents[item] = []
 
+        scans = []
         for page in range(Glop.inv_pages_unlocked):
             Inputs.click(*coords.INVENTORY_PAGE[page])
             time.sleep(userset.LONG_SLEEP)
             bmp = Inputs.get_bitmap()
-            
-            for item in coords.GLOP_FILENAMES:
-                path = Inputs.get_file_path("images", item)
-                # Using the whole window instead of cropping out just the inventory yields higher accuracy
-                rect = (Window.x, Window.y, Window.x + 960, Window.y + 600)
-                res = Inputs.find_all(*rect, path, threshold=0.9, bmp=bmp)
-                reagents = list(map(lambda x: Reagent(x[0], x[1], item, page), res))
-                if reagents: Glop.reagents[item].extend(reagents)
+            scans.append(Inputs.get_pool().submit(InventoryScanner.scan, coords.GLOP_FILENAMES, bmp=bmp))
+
+        for page, scan in enumerate(scans):
+            for slot, item in scan.result().items():
+                x, y = InventoryScanner.slot_center(slot)
+                Glop.reagents[item].append(Reagent(x, y, item, page))
         
         print("\nScan found these glop reagents\n")
         for item in coords.GLOP_FILENAMES:
@@ -6,6 +6,32 @@ SHORT_SLEEP = 0.15
 MEDIUM_SLEEP = 0.3
 LONG_SLEEP = 0.4
 
+# FRAME CACHE
+# Max age in seconds of a cached window capture before pixel reads capture a
+# new one. Inputs always drop the cached capture. Set to 0 to disable.
+FRAME_TTL = 0.05
+
+# CAPTURE WORKER
+# Capture the window in a background thread CAPTURE_RATE times per second
+# instead of on demand, keeping the last CAPTURE_BUFFER frames around.
+# Reads use the newest frame if it's younger than FRAME_TTL.
+CAPTURE_WORKER = False
+CAPTURE_RATE = 30
+CAPTURE_BUFFER = 3
+
+# FRAME SOURCE
+# "win32" captures the game window. "replay" reads recorded full window
+# screenshots (Inputs.save_screenshot(full=True)) from REPLAY_PATH instead,
+# which runs the pixel, OCR and image search code without the game.
+FRAME_SOURCE = "win32"
+REPLAY_PATH = "screenshots"
+
+# OCR ENGINE
+# "tesserocr" keeps tesseract loaded between reads, which is much faster but
+# needs the tesserocr package. "pytesseract" starts tesseract for every read.
+# "auto" uses tesserocr if it's installed.
+OCR_ENGINE = "auto"
+
 # How long to farm blood for spell casting (in seconds)
 SPELL = 300
 
@@ -15,3 +41,9 @@ INFO_URL = ""
 
 # STATS
 E_RATE_KEEP_RUNS = 60
+# Seconds the power, bars and cap read from the stat breakdown are reused
+# by Misc.get_pow, get_bars and get_cap before they're read again.
+BREAKDOWN_TTL = 60
+# Read the XP and PP of a run in the background while the script goes on,
+# the rates are updated once the values are read.
+ASYNC_STATS = True